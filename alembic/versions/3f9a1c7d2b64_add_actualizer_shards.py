@@ -0,0 +1,44 @@
+"""add actualizer shards
+
+Revision ID: 3f9a1c7d2b64
+Revises: 249698674045
+Create Date: 2026-10-19 10:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c7d2b64'
+down_revision: Union[str, None] = '249698674045'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('actualizershard',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job', sa.String(), nullable=False),
+    sa.Column('product_id_from', sa.Integer(), nullable=False),
+    sa.Column('product_id_to', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('lease_owner', sa.String(), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job', 'product_id_from')
+    )
+    op.create_index(op.f('ix_actualizershard_id'), 'actualizershard', ['id'], unique=False)
+    op.create_index(op.f('ix_actualizershard_job'), 'actualizershard', ['job'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_actualizershard_job'), table_name='actualizershard')
+    op.drop_index(op.f('ix_actualizershard_id'), table_name='actualizershard')
+    op.drop_table('actualizershard')
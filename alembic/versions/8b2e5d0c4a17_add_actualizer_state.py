@@ -0,0 +1,36 @@
+"""add actualizer state
+
+Revision ID: 8b2e5d0c4a17
+Revises: 3f9a1c7d2b64
+Create Date: 2026-10-19 11:03:17.204655
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e5d0c4a17'
+down_revision: Union[str, None] = '3f9a1c7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('actualizerstate',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job', sa.String(), nullable=False),
+    sa.Column('last_success_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job')
+    )
+    op.create_index(op.f('ix_actualizerstate_id'), 'actualizerstate', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_actualizerstate_id'), table_name='actualizerstate')
+    op.drop_table('actualizerstate')
@@ -0,0 +1,26 @@
+"""add product price id index
+
+Revision ID: a7e3c91f5d28
+Revises: c5d81e2f9a30
+Create Date: 2026-10-19 16:42:11.308214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3c91f5d28'
+down_revision: Union[str, None] = 'c5d81e2f9a30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_product_price_id', 'product', ['price', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_product_price_id', table_name='product')
@@ -0,0 +1,55 @@
+"""catalog version counter row
+
+Revision ID: b3f6e0d92c47
+Revises: d4b8f2a6c013
+Create Date: 2026-10-20 09:12:31.408215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f6e0d92c47'
+down_revision: Union[str, None] = 'd4b8f2a6c013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # nextval is not transactional: a reader could see the new version before the write
+    # committed and cache the old catalog under it. The counter row is updated inside the
+    # writing transaction, so a snapshot always sees the version of the rows it sees.
+    # Concurrent catalog writers now queue on this row until the first one commits.
+    op.create_table(
+        'catalog_version',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.CheckConstraint('id = 1', name='catalog_version_single_row'),
+    )
+    op.execute("INSERT INTO catalog_version (id, version) SELECT 1, last_value + 1 FROM catalog_version_seq")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("DROP SEQUENCE catalog_version_seq")
+
+
+def downgrade() -> None:
+    op.execute("CREATE SEQUENCE catalog_version_seq")
+    op.execute("SELECT setval('catalog_version_seq', version + 1) FROM catalog_version")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+        BEGIN
+            PERFORM nextval('catalog_version_seq');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.drop_table('catalog_version')
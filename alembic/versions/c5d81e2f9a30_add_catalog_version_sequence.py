@@ -0,0 +1,56 @@
+"""add catalog version sequence
+
+Revision ID: c5d81e2f9a30
+Revises: 8b2e5d0c4a17
+Create Date: 2026-10-19 14:26:05.731942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d81e2f9a30'
+down_revision: Union[str, None] = '8b2e5d0c4a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATALOG_TABLES = [
+    'product',
+    'cpuattributes',
+    'cpucoolerattributes',
+    'gpuattributes',
+    'motherboardattributes',
+    'ramattributes',
+    'storageattributes',
+    'powersupplyattributes',
+    'caseattributes',
+]
+
+
+def upgrade() -> None:
+    # A sequence instead of a counter row: nextval never blocks concurrent writers.
+    op.execute("CREATE SEQUENCE catalog_version_seq")
+    op.execute("""
+        CREATE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+        BEGIN
+            PERFORM nextval('catalog_version_seq');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in CATALOG_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_bump_catalog_version
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
+        """)
+
+
+def downgrade() -> None:
+    for table in CATALOG_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_bump_catalog_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_catalog_version()")
+    op.execute("DROP SEQUENCE IF EXISTS catalog_version_seq")
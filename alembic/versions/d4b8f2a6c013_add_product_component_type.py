@@ -0,0 +1,44 @@
+"""add product component type
+
+Revision ID: d4b8f2a6c013
+Revises: a7e3c91f5d28
+Create Date: 2026-10-19 18:05:42.917630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b8f2a6c013'
+down_revision: Union[str, None] = 'a7e3c91f5d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ATTRS_TABLE_BY_COMPONENT_TYPE = {
+    'cpu': 'cpuattributes',
+    'cpu_cooler': 'cpucoolerattributes',
+    'gpu': 'gpuattributes',
+    'motherboard': 'motherboardattributes',
+    'ram': 'ramattributes',
+    'storage': 'storageattributes',
+    'psu': 'powersupplyattributes',
+    'case': 'caseattributes',
+}
+
+
+def upgrade() -> None:
+    op.add_column('product', sa.Column('component_type', sa.String(length=16), nullable=True))
+    for component_type, table in ATTRS_TABLE_BY_COMPONENT_TYPE.items():
+        op.execute(
+            sa.text(f"UPDATE product SET component_type = :component_type FROM {table} WHERE {table}.product_id = product.id")
+            .bindparams(component_type=component_type)
+        )
+    op.create_index(op.f('ix_product_component_type'), 'product', ['component_type'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_product_component_type'), table_name='product')
+    op.drop_column('product', 'component_type')
@@ -1,21 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
+from app.core.config import get_settings
 from app.db.session import get_db
-from app.schemas.product import ProductRead, ProductUpdate
+from app.schemas.product import ProductCursor, ProductRead, ProductUpdate
+from app.schemas.build import (
+    BuildSpec,
+    BuildRead,
+    BuildResult,
+    BatchBuildResult,
+    BuildSweepSpec,
+    BuildSweepPoint,
+    BuildCacheStats,
+)
 from app.crud.product import product_crud
 from app.services.keepa import fetch_product_from_keepa
+from app.services.pc_builder.batch import build_batch, build_sweep
+from app.services.pc_builder.builder import NoSuitableComponent
+from app.services.pc_builder.cache import build_cache
+from app.services.pc_builder.runner import BuildsBusy, run_build_async
 
+settings = get_settings()
 router = APIRouter(prefix="/products", tags=["products"])
+builds_router = APIRouter(prefix="/builds", tags=["builds"])
 
 @router.post("/{asin}", response_model=ProductRead, status_code=status.HTTP_201_CREATED)
-def add_product(asin: str, db: Session = Depends(get_db)):
+def add_product(asin: str, response: Response, db: Session = Depends(get_db)):
+    existing = product_crud.get_by_asin(db, asin)
+    if existing:
+        response.status_code = status.HTTP_200_OK
+        if not product_crud.is_stale(existing, settings.product_refresh_ttl_seconds):
+            return ProductRead.from_orm_with_attrs(existing)
+
     obj_in = fetch_product_from_keepa(asin, db=db)
-    return product_crud.create(db, obj_in=obj_in)
+    return ProductRead.from_orm_with_attrs(product_crud.upsert(db, obj_in=obj_in))
 
 @router.get("/", response_model=list[ProductRead])
-def list_products(page: int = Query(1, ge=1), page_size: int = Query(20, ge=1, le=100), db: Session = Depends(get_db)):
-    items, _ = product_crud.get_multi(db, page=page, page_size=page_size)
-    return [ProductRead.from_orm_with_attrs(i) for i in items]
+def list_products(
+    response: Response,
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    sort: Literal["id", "price"] = Query("id", description="price lists priced products only"),
+    total: Optional[Literal["exact", "estimate"]] = Query(None, description="Return the total in X-Total-Count"),
+    page: Optional[int] = Query(None, ge=1, deprecated=True, description="Offset paging, use cursor instead"),
+    db: Session = Depends(get_db),
+):
+    if page is not None and cursor is not None:
+        raise HTTPException(status_code=400, detail="Pass either page or cursor")
+    if page is not None:
+        items = product_crud.get_multi(db, page=page, page_size=page_size, sort=sort)
+    else:
+        try:
+            items, next_cursor = product_crud.get_page(
+                db,
+                page_size=page_size,
+                cursor=ProductCursor.decode(cursor) if cursor else None,
+                sort=sort,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = next_cursor.encode()
+
+    if total is not None:
+        response.headers["X-Total-Count"] = str(product_crud.count(db, sort=sort, estimate=total == "estimate"))
+    # Plain rows, validated and serialized to JSON once by the response model
+    return [ProductRead.row_from_orm(i) for i in items]
 
 @router.get(
     "/random-per-category",
@@ -45,3 +96,47 @@ def update_product(product_id: int, item: ProductUpdate, db: Session = Depends(g
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_product(product_id: int, db: Session = Depends(get_db)):
     product_crud.remove(db, id_=product_id)
+
+
+def _build_read(build: dict) -> BuildRead:
+    return BuildRead(
+        components={component_type: ProductRead.from_orm_with_attrs(product) for component_type, product in build.items()},
+        total_price=round(sum(product.price or 0 for product in build.values()), 2),
+    )
+
+@builds_router.post("", response_model=BuildResult)
+async def create_build(spec: BuildSpec):
+    # Runs on the build pool with its own session, the event loop only waits for it
+    try:
+        build, partial, trace = await run_build_async(spec)
+    except BuildsBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except NoSuitableComponent as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return BuildResult(build=_build_read(build) if build else None, partial=partial, trace=trace)
+
+@builds_router.post("/batch", response_model=list[BatchBuildResult])
+def create_builds_batch(specs: list[BuildSpec], db: Session = Depends(get_db)):
+    results = build_batch(db, specs)
+    return [
+        BatchBuildResult(spec=spec, build=_build_read(build) if build else None, error=error, trace=trace)
+        for spec, build, error, trace in results
+    ]
+
+@builds_router.post("/sweep", response_model=list[BuildSweepPoint])
+def create_builds_sweep(spec: BuildSweepSpec, db: Session = Depends(get_db)):
+    budgets = spec.budgets()
+    try:
+        results = build_sweep(db, spec.purpose, budgets, spec.overrides)
+    except NoSuitableComponent as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return [
+        BuildSweepPoint(budget=budget)
+        if result is None
+        else BuildSweepPoint(budget=budget, score=round(result[1], 4), build=_build_read(result[2]))
+        for budget, result in zip(budgets, results)
+    ]
+
+@builds_router.get("/cache", response_model=BuildCacheStats, summary="Build cache hit rate and saved build time")
+def build_cache_stats():
+    return build_cache.stats()
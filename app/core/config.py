@@ -11,6 +11,33 @@ class Settings(BaseSettings):
     postgres_dsn: str = Field(..., alias="POSTGRES_DSN")
     keepa_key: str = Field(..., alias="KEEPA_API_KEY")
 
+    keepa_finder_max_results: int = Field(10000, alias="KEEPA_FINDER_MAX_RESULTS")
+
+    # Age after which POST /products/{asin} refetches an existing product, never by default.
+    product_refresh_ttl_seconds: int | None = Field(None, alias="PRODUCT_REFRESH_TTL_SECONDS")
+    # How long an exact product count is reused for estimated totals of GET /products.
+    product_count_cache_seconds: int = Field(60, alias="PRODUCT_COUNT_CACHE_SECONDS")
+
+    # JSON file with the PC builder rule sets per purpose, built-in defaults when unset.
+    pc_builder_rules_path: str | None = Field(None, alias="PC_BUILDER_RULES_PATH")
+
+    # Threads running independent component selections of a build, 1 to select one after another.
+    pc_builder_workers: int = Field(4, alias="PC_BUILDER_WORKERS")
+    # POST /builds: builds running at once (each holds a DB connection) and time before a partial build is returned.
+    pc_builder_max_concurrent_builds: int = Field(8, alias="PC_BUILDER_MAX_CONCURRENT_BUILDS")
+    pc_builder_deadline_seconds: float = Field(2.0, alias="PC_BUILDER_DEADLINE_SECONDS")
+
+    # Directory of the memory-mapped catalog shared by worker processes, unused when unset.
+    pc_builder_shared_catalog_dir: str | None = Field(None, alias="PC_BUILDER_SHARED_CATALOG_DIR")
+    pc_builder_shared_catalog_refresh_seconds: float = Field(30.0, alias="PC_BUILDER_SHARED_CATALOG_REFRESH_SECONDS")
+
+    build_cache_size: int = Field(1024, alias="BUILD_CACHE_SIZE")
+    # Budgets are rounded down to this step, so nearby budgets share a cached build.
+    build_cache_budget_step: float = Field(25.0, alias="BUILD_CACHE_BUDGET_STEP")
+
+    actualizer_shard_size: int = Field(1000, alias="ACTUALIZER_SHARD_SIZE")
+    actualizer_lease_seconds: int = Field(300, alias="ACTUALIZER_LEASE_SECONDS")
+
     model_config = SettingsConfigDict(
         env_file=Path(__file__).resolve().parent.parent.parent / ".env",
         env_file_encoding="utf-8",
@@ -1,22 +1,46 @@
-from sqlalchemy import select, func
+from collections import defaultdict
+from datetime import datetime, timezone
+import threading
+import time
+
+from sqlalchemy import select, func, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import joinedload, Session
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models.product import Product
-from app.schemas.product import ProductCreate, ProductUpdate
+from app.core.config import get_settings
+from app.models.product import ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE, Product
+from app.schemas.product import ProductCreate, ProductCursor, ProductUpdate
 
 
 class CRUDProduct:
-    def _get_joinedload_attrs_option(self):
-        return (
-            joinedload(Product.cpu_attributes),
-            joinedload(Product.cpu_cooler_attributes),
-            joinedload(Product.case_attributes),
-            joinedload(Product.gpu_attributes),
-            joinedload(Product.motherboard_attributes),
-            joinedload(Product.power_supply_attributes),
-            joinedload(Product.ram_attributes),
-            joinedload(Product.storage_attributes),
-        )
+    def __init__(self):
+        # (sort) -> (count, expires at), see `count`
+        self._counts: dict[str, tuple[int, float]] = {}
+        self._counts_lock = threading.Lock()
+
+    def _load_attrs(self, db: Session, products: list[Product]) -> list[Product]:
+        """
+        Load the attrs row of each product with one query per component type on the page,
+        picked by `Product.component_type`, instead of joining all eight attrs tables.
+        Every other attrs relationship is set to None, so none of them lazy-loads later.
+        """
+        by_type: dict[str | None, list[Product]] = defaultdict(list)
+        for product in products:
+            by_type[product.component_type].append(product)
+
+        for component_type, group in by_type.items():
+            relationship = ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE.get(component_type)
+            attrs_by_product_id = {}
+            if relationship is not None:
+                attrs_model = getattr(Product, relationship).property.mapper.class_
+                stmt = select(attrs_model).where(attrs_model.product_id.in_([product.id for product in group]))
+                attrs_by_product_id = {attrs.product_id: attrs for attrs in db.scalars(stmt)}
+            for product in group:
+                for name in ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE.values():
+                    if name not in product.__dict__:
+                        set_committed_value(product, name, attrs_by_product_id.get(product.id) if name == relationship else None)
+        return products
 
     def create(self, db: Session, *, obj_in: ProductCreate) -> Product:
         db_obj = Product(**obj_in.model_dump())
@@ -25,20 +49,153 @@ class CRUDProduct:
         db.refresh(db_obj, attribute_names=["category"])
         return db_obj
 
+    def bulk_create(self, db: Session, *, objs_in: list[ProductCreate]) -> list[str]:
+        """
+        Insert many products with one statement, skipping ASINs that already exist.
+        :return: ASINs that were actually inserted.
+        """
+        if not objs_in:
+            return []
+        now = datetime.now(timezone.utc)
+        stmt = (
+            insert(Product)
+            .values([{**obj_in.model_dump(), "created_at": now, "updated_at": now} for obj_in in objs_in])
+            .on_conflict_do_nothing(index_elements=[Product.asin])
+            .returning(Product.asin)
+        )
+        inserted = db.execute(stmt).scalars().all()
+        db.commit()
+        return inserted
+
+    def bulk_update(self, db: Session, *, values: list[dict]) -> None:
+        """
+        Update many products by primary key in one executemany round trip.
+        Every dict must contain ``id`` plus the columns to set.
+        """
+        if not values:
+            return
+        db.execute(update(Product), values)
+        db.commit()
+
+    def upsert(self, db: Session, *, obj_in: ProductCreate) -> Product:
+        """
+        Insert a product or overwrite the Keepa fields of the existing one with the same ASIN.
+        Safe against concurrent imports of the same ASIN.
+        """
+        now = datetime.now(timezone.utc)
+        values = obj_in.model_dump()
+        stmt = insert(Product).values(**values, created_at=now, updated_at=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Product.asin],
+            set_={
+                **{field: stmt.excluded[field] for field in values if field != "asin"},
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ).returning(Product.id)
+        id_ = db.execute(stmt).scalar_one()
+        db.commit()
+        return self.get(db, id_)
+
     def get(self, db: Session, id_: int):
-        return db.get(Product, id_, options=(self._get_joinedload_attrs_option()))
+        obj = db.get(Product, id_)
+        return self._load_attrs(db, [obj])[0] if obj else None
 
-    def get_multi(self, db: Session, *, page: int = 1, page_size: int = 20):
+    def get_by_asin(self, db: Session, asin: str) -> Product | None:
         stmt = (
             select(Product)
-            .options(
-                *self._get_joinedload_attrs_option()
-            )
+            .options(joinedload(Product.category))
+            .where(Product.asin == asin)
+        )
+        obj = db.execute(stmt).unique().scalar_one_or_none()
+        return self._load_attrs(db, [obj])[0] if obj else None
+
+    def is_stale(self, obj: Product, max_age_seconds: int | None) -> bool:
+        """
+        :param max_age_seconds: None means a stored product never needs a refresh.
+        """
+        if max_age_seconds is None:
+            return False
+        updated_at = obj.updated_at
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        return (datetime.now(timezone.utc) - updated_at).total_seconds() > max_age_seconds
+
+    def _listing(self, sort: str):
+        """
+        Products listed with the given sort, in keyset order. Sorting by price lists priced products only.
+        """
+        stmt = select(Product)
+        if sort == "price":
+            return stmt.where(Product.price.isnot(None)).order_by(Product.price, Product.id)
+        return stmt.order_by(Product.id)
+
+    def get_multi(self, db: Session, *, page: int = 1, page_size: int = 20, sort: str = "id") -> list[Product]:
+        """
+        Offset pagination, cost grows with the page number. Prefer `get_page`.
+        """
+        stmt = (
+            self._listing(sort)
             .offset((page - 1) * page_size)
             .limit(page_size)
         )
-        total = db.scalar(select(func.count()).select_from(Product))
-        return db.scalars(stmt).all(), total
+        return self._load_attrs(db, db.scalars(stmt).all())
+
+    def get_page(
+        self,
+        db: Session,
+        *,
+        page_size: int = 20,
+        cursor: ProductCursor | None = None,
+        sort: str = "id",
+    ) -> tuple[list[Product], ProductCursor | None]:
+        """
+        Keyset pagination on (id) or (price, id): every page is an index range scan
+        starting right after the cursor, so deep pages cost the same as the first one.
+        :param cursor: Cursor returned with the previous page, None for the first page.
+        :return: (products, cursor of the next page or None on the last page)
+        """
+        if cursor is not None and cursor.sort != sort:
+            raise ValueError(f"Cursor was issued for sort={cursor.sort}")
+
+        stmt = self._listing(sort).limit(page_size + 1)
+        if cursor is not None:
+            if sort == "price":
+                stmt = stmt.where(tuple_(Product.price, Product.id) > tuple_(cursor.price, cursor.id))
+            else:
+                stmt = stmt.where(Product.id > cursor.id)
+
+        items = db.scalars(stmt).all()
+        if len(items) <= page_size:
+            return self._load_attrs(db, items), None
+        items = self._load_attrs(db, items[:page_size])
+        last = items[-1]
+        return items, ProductCursor(sort=sort, id=last.id, price=last.price if sort == "price" else None)
+
+    def count(self, db: Session, *, sort: str = "id", estimate: bool = False) -> int:
+        """
+        Number of products the listing with this sort goes through.
+        :param estimate: Allow an approximate number: the planner's row estimate from
+            pg_class.reltuples for the whole table, otherwise an exact count cached
+            for PRODUCT_COUNT_CACHE_SECONDS.
+        """
+        if not estimate:
+            return db.scalar(select(func.count()).select_from(self._listing(sort).order_by(None).subquery()))
+
+        if sort == "id" and db.get_bind().dialect.name == "postgresql":
+            reltuples = db.scalar(text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'product'::regclass"))
+            # -1 until the table was first vacuumed or analyzed
+            if reltuples is not None and reltuples >= 0:
+                return reltuples
+
+        now = time.monotonic()
+        with self._counts_lock:
+            cached = self._counts.get(sort)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        total = self.count(db, sort=sort)
+        with self._counts_lock:
+            self._counts[sort] = (total, now + get_settings().product_count_cache_seconds)
+        return total
 
     def update(self, db: Session, *, db_obj: Product, obj_in: ProductUpdate):
         for field, value in obj_in.dict(exclude_unset=True).items():
@@ -1,5 +1,15 @@
+from datetime import datetime, timezone
+
 from sqlalchemy.orm import as_declarative, declared_attr
 
+
+def utcnow() -> datetime:
+    """
+    Column default for timestamps, called on every insert or update.
+    """
+    return datetime.now(timezone.utc)
+
+
 @as_declarative()
 class Base:
     id: int
@@ -1,7 +1,8 @@
 from fastapi import FastAPI
 from app.core.config import get_settings
-from app.api.v1 import router as products_router
+from app.api.v1 import router as products_router, builds_router
 
 settings = get_settings()
 app = FastAPI(title=settings.app_name)
 app.include_router(products_router, prefix=settings.api_prefix)
+app.include_router(builds_router, prefix=settings.api_prefix)
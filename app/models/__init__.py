@@ -1,5 +1,6 @@
 from .category import Category
-from .product import Product
+from .product import Product, ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE, attrs_model
+from .actualizer import ActualizerShard, ActualizerState
 from .attributes import (
     CPUAttributes,
     CPUCoolerAttributes,
@@ -15,6 +16,10 @@ from .attributes import (
 __all__ = [
     "Category", 
     "Product",
+    "ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE",
+    "attrs_model",
+    "ActualizerShard",
+    "ActualizerState",
     "CPUAttributes",
     "CPUCoolerAttributes",
     "GPUAttributes",
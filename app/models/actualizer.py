@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from app.db.base import Base, utcnow
+
+
+class ActualizerShard(Base):
+    __table_args__ = (UniqueConstraint("job", "product_id_from"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    job = Column(String, nullable=False, index=True)
+    product_id_from = Column(Integer, nullable=False)
+    product_id_to = Column(Integer, nullable=False)
+
+    status = Column(String, nullable=False, default="pending")
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    completed_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow, nullable=False)
+
+
+class ActualizerState(Base):
+    id = Column(Integer, primary_key=True, index=True)
+    job = Column(String, nullable=False, unique=True)
+    last_success_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow, nullable=False)
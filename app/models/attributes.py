@@ -1,7 +1,6 @@
 from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, BigInteger
 from sqlalchemy.orm import relationship
-from app.db.base import Base
-from datetime import datetime, timezone
+from app.db.base import Base, utcnow
 
 
 class BaseAttrsModel(Base):
@@ -9,8 +8,8 @@ class BaseAttrsModel(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(BigInteger, ForeignKey("product.id", ondelete="CASCADE"), unique=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow, nullable=False)
 
     brand = Column(String)
     model = Column(String)
@@ -1,7 +1,6 @@
-from datetime import datetime, timezone
 from sqlalchemy import Column, Integer, String, DateTime, BigInteger
 from sqlalchemy.orm import relationship
-from app.db.base import Base
+from app.db.base import Base, utcnow
 
 
 class Category(Base):
@@ -11,5 +10,5 @@ class Category(Base):
 
     products = relationship("Product", back_populates="category")
 
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
\ No newline at end of file
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow, nullable=False)
\ No newline at end of file
@@ -1,12 +1,12 @@
 from typing import TYPE_CHECKING
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, BigInteger
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, BigInteger, Index
 from sqlalchemy.orm import relationship, Mapped
-from app.db.base import Base
-from datetime import datetime, timezone
+from app.db.base import Base, utcnow
 
 
 if TYPE_CHECKING:
     from app.models import (
+        BaseAttrsModel,
         CPUAttributes, 
         CPUCoolerAttributes, 
         GPUAttributes, 
@@ -18,12 +18,32 @@ if TYPE_CHECKING:
     )
 
 
+# Product.component_type value -> relationship holding the product's attrs row
+ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE: dict[str, str] = {
+    "cpu": "cpu_attributes",
+    "cpu_cooler": "cpu_cooler_attributes",
+    "gpu": "gpu_attributes",
+    "motherboard": "motherboard_attributes",
+    "ram": "ram_attributes",
+    "storage": "storage_attributes",
+    "psu": "power_supply_attributes",
+    "case": "case_attributes",
+}
+
+
 class Product(Base):
+    __table_args__ = (
+        # Keyset pagination by price, see `CRUDProduct.get_page`
+        Index("ix_product_price_id", "price", "id"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     asin = Column(String(12), unique=True, index=True, nullable=False)
     title = Column(String, nullable=False)
     price = Column(Float, nullable=True)
     rating = Column(Float, nullable=True)
+    # Which attrs table has the product's row, a key of ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE. None: no attrs.
+    component_type = Column(String(16), nullable=True, index=True)
 
     cpu_attributes: Mapped["CPUAttributes"] = relationship("CPUAttributes", back_populates="product", uselist=False)
     cpu_cooler_attributes: Mapped["CPUCoolerAttributes"] = relationship("CPUCoolerAttributes", back_populates="product", uselist=False)
@@ -37,5 +57,12 @@ class Product(Base):
     category_id = Column(BigInteger, ForeignKey("category.id", ondelete="SET NULL"))
     category = relationship("Category", back_populates="products")
 
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
\ No newline at end of file
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow, nullable=False)
+
+
+def attrs_model(component_type: str) -> type["BaseAttrsModel"]:
+    """
+    Attrs model behind the component type's relationship in ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE.
+    """
+    return getattr(Product, ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE[component_type]).property.mapper.class_
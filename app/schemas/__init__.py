@@ -1 +1,2 @@
-from .product import ProductRead, ProductCreate, ProductUpdate
+from .product import ProductRead, ProductCreate, ProductUpdate, ProductCursor
+from .build import BuildSpec, BuildRead, BuildResult, BatchBuildResult, BuildSweepSpec, BuildSweepPoint, BuildCacheStats
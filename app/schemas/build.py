@@ -0,0 +1,75 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from .product import ProductRead
+
+
+class BuildSpec(BaseModel):
+    budget: float = Field(..., gt=0)
+    purpose: str
+    overrides: dict[str, str] = Field(default_factory=dict)
+    optimize: bool = False
+    trace: bool = False
+
+
+class BuildRead(BaseModel):
+    components: dict[str, ProductRead]
+    total_price: float
+
+
+class BuildResult(BaseModel):
+    build: Optional[BuildRead] = None
+    # The deadline passed first: build is the best found so far and may miss components
+    partial: bool = False
+    trace: Optional[dict] = None
+
+
+class BatchBuildResult(BaseModel):
+    spec: BuildSpec
+    build: Optional[BuildRead] = None
+    error: Optional[str] = None
+    trace: Optional[dict] = None
+
+
+# Every point of a sweep is a full build in the response
+MAX_SWEEP_POINTS = 400
+
+
+class BuildSweepSpec(BaseModel):
+    purpose: str
+    budget_from: float = Field(400, gt=0)
+    budget_to: float = Field(4000, gt=0, le=20000)
+    budget_step: float = Field(50, gt=0)
+    overrides: dict[str, str] = Field(default_factory=dict)
+
+    @model_validator(mode="after")
+    def check_range(self) -> "BuildSweepSpec":
+        if self.budget_to < self.budget_from:
+            raise ValueError("budget_to must not be less than budget_from")
+        if self.point_count() > MAX_SWEEP_POINTS:
+            raise ValueError(f"A sweep has at most {MAX_SWEEP_POINTS} budget points, raise budget_step")
+        return self
+
+    def point_count(self) -> int:
+        return int((self.budget_to - self.budget_from) // self.budget_step) + 1
+
+    def budgets(self) -> list[float]:
+        return [round(self.budget_from + i * self.budget_step, 2) for i in range(self.point_count())]
+
+
+class BuildSweepPoint(BaseModel):
+    budget: float
+    score: Optional[float] = None
+    build: Optional[BuildRead] = None
+
+
+class BuildCacheStats(BaseModel):
+    entries: int
+    hits: int
+    misses: int
+    # Requests that waited for an identical build in progress instead of computing it
+    coalesced: int
+    hit_rate: float
+    # Build time hits and coalesced requests didn't spend
+    saved_seconds: float
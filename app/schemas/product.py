@@ -1,10 +1,24 @@
+import base64
+import json
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
-from app.models.product import Product
+from app.models.attributes import (
+    BaseAttrsModel,
+    CPUAttributes,
+    CPUCoolerAttributes,
+    GPUAttributes,
+    MotherboardAttributes,
+    RAMAttributes,
+    StorageAttributes,
+    PowerSupplyAttributes,
+    CaseAttributes,
+)
+from app.models.product import ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE, Product, attrs_model
 from app.schemas.attributes import (
+    BaseAttrsSchema,
     CPUAttributesSchema,
     CPUCoolerAttributesSchema,
     GPUAttributesSchema,
@@ -17,6 +31,25 @@ from app.schemas.attributes import (
 from .category import CategoryRead
 
 
+# Read schema of each attrs model
+ATTRS_SCHEMA_BY_MODEL: dict[type[BaseAttrsModel], type[BaseAttrsSchema]] = {
+    CPUAttributes: CPUAttributesSchema,
+    CPUCoolerAttributes: CPUCoolerAttributesSchema,
+    GPUAttributes: GPUAttributesSchema,
+    MotherboardAttributes: MotherboardAttributesSchema,
+    RAMAttributes: RAMAttributesSchema,
+    StorageAttributes: StorageAttributesSchema,
+    PowerSupplyAttributes: PowerSupplyAttributesSchema,
+    CaseAttributes: CaseAttributesSchema,
+}
+
+# Product.component_type -> (attrs relationship, read schema of the attrs row)
+ATTRS_BY_COMPONENT_TYPE: dict[str, tuple[str, type[BaseModel]]] = {
+    component_type: (attr_name, ATTRS_SCHEMA_BY_MODEL[attrs_model(component_type)])
+    for component_type, attr_name in ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE.items()
+}
+
+
 class ProductBase(BaseModel):
     asin: str = Field(..., min_length=10, max_length=12)
     title: str
@@ -44,32 +77,85 @@ class ProductUpdate(BaseModel):
 class ProductRead(ProductBase):
     id: int
     created_at: datetime
+    component_type: Optional[str] = None
     category: Optional[CategoryRead] = None
     attrs: Optional[dict] = None
 
+    @classmethod
+    def row_from_orm(cls, obj: Product) -> dict:
+        """
+        Map a product to the fields of ProductRead without validating them, for endpoints
+        that let their response model validate and serialize the page in one pass.
+        Loaded values are read straight from the instance dict, skipping SQLAlchemy's
+        attribute instrumentation. The category is included only if it was loaded.
+        The attrs relationship is picked by `Product.component_type`; products without one
+        (not persisted yet, or never typed) are probed relationship by relationship.
+        """
+        component_type = _loaded(obj, "component_type")
+        if component_type is not None:
+            attr_name, fields = _ATTRS_FIELDS[component_type]
+            attrs_model = _loaded(obj, attr_name)
+        else:
+            attrs_model, fields = None, ()
+            for attr_name, fields in _ATTRS_FIELDS.values():
+                attrs_model = getattr(obj, attr_name, None)
+                if attrs_model:
+                    break
+
+        category = obj.__dict__.get("category")
+        return {
+            **{field: _loaded(obj, field) for field in _PRODUCT_FIELDS},
+            "category": {field: _loaded(category, field) for field in _CATEGORY_FIELDS} if category else None,
+            "attrs": {field: _loaded(attrs_model, field) for field in fields} if attrs_model else None,
+        }
+
     @classmethod
     def from_orm_with_attrs(cls, obj: Product) -> "ProductRead":
         """
-        Construct ProductRead instance with resolved attrs field.
+        Construct ProductRead instance with resolved attrs field, see `row_from_orm`.
         """
+        return cls.model_validate(cls.row_from_orm(obj))
+
+
+_UNLOADED = object()
+_PRODUCT_FIELDS = tuple(field for field in ProductRead.model_fields if field not in ("category", "attrs"))
+_CATEGORY_FIELDS = tuple(CategoryRead.model_fields)
+# Product.component_type -> (attrs relationship, columns of the attrs row in the response)
+_ATTRS_FIELDS: dict[str, tuple[str, tuple[str, ...]]] = {
+    component_type: (attr_name, tuple(schema.model_fields))
+    for component_type, (attr_name, schema) in ATTRS_BY_COMPONENT_TYPE.items()
+}
 
-        mapping: list[tuple[str, BaseModel]] = [
-            ("cpu_attributes", CPUAttributesSchema),
-            ("cpu_cooler_attributes", CPUCoolerAttributesSchema),
-            ("gpu_attributes", GPUAttributesSchema),
-            ("motherboard_attributes", MotherboardAttributesSchema),
-            ("ram_attributes", RAMAttributesSchema),
-            ("storage_attributes", StorageAttributesSchema),
-            ("power_supply_attributes", PowerSupplyAttributesSchema),
-            ("case_attributes", CaseAttributesSchema),
-        ]
-
-        for attr_name, schema in mapping:
-            attrs_model = getattr(obj, attr_name, None)
-            if attrs_model:
-                return cls(
-                    **obj.__dict__,
-                    attrs=schema.model_validate(attrs_model).model_dump()
-                )
-
-        return cls(**obj.__dict__, attrs=None)
+
+def _loaded(obj, name: str):
+    """
+    Value of a mapped attribute, from the instance dict when loaded, else through the attribute.
+    """
+    value = obj.__dict__.get(name, _UNLOADED)
+    return getattr(obj, name) if value is _UNLOADED else value
+
+
+class ProductCursor(BaseModel):
+    """
+    Position after the last product of a page, for keyset pagination.
+    Handed to clients as an opaque token, see `encode` and `decode`.
+    """
+    sort: Literal["id", "price"] = "id"
+    id: int
+    price: Optional[float] = None
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.model_dump_json(exclude_none=True).encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "ProductCursor":
+        """
+        :raise ValueError: The token is not a cursor.
+        """
+        try:
+            cursor = cls.model_validate(json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))))
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError("Invalid cursor") from e
+        if cursor.sort == "price" and cursor.price is None:
+            raise ValueError("Invalid cursor")
+        return cursor
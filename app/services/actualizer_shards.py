@@ -0,0 +1,163 @@
+"""
+Lease-based work distribution for actualizer jobs.
+
+A job run is split into shards covering disjoint product id ranges. Workers,
+possibly on different hosts, claim shards with ``SELECT ... FOR UPDATE SKIP LOCKED``,
+renew the lease while they work and mark the shard done at the end. Shards whose
+lease expired (crashed worker) become claimable again.
+"""
+
+from datetime import timedelta
+import logging
+
+from sqlalchemy import select, update, or_, and_, func, exists
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models import Product, ActualizerShard
+
+settings = get_settings()
+
+SHARD_PENDING = "pending"
+SHARD_LEASED = "leased"
+SHARD_DONE = "done"
+
+
+def _lease_deadline(lease_seconds: int):
+    return func.now() + timedelta(seconds=lease_seconds)
+
+
+def plan_shards(db: Session, job: str, shard_size: int | None = None) -> int:
+    """
+    Split the product table into shards for a new run of ``job``.
+    Does nothing while a previous run still has unfinished shards.
+    :return: Number of shards created.
+    """
+    shard_size = shard_size or settings.actualizer_shard_size
+
+    # Serialize planners of the same job, the lock is released on commit.
+    db.execute(select(func.pg_advisory_xact_lock(func.hashtext(job))))
+
+    unfinished = db.scalar(
+        select(
+            exists().where(
+                ActualizerShard.job == job,
+                ActualizerShard.status != SHARD_DONE,
+            )
+        )
+    )
+    if unfinished:
+        db.commit()
+        return 0
+
+    product_ids: list[int] = db.execute(select(Product.id).order_by(Product.id)).scalars().all()
+    boundaries = product_ids[::shard_size]
+
+    db.query(ActualizerShard).filter(ActualizerShard.job == job).delete()
+    for i, id_from in enumerate(boundaries):
+        id_to = boundaries[i + 1] if i + 1 < len(boundaries) else product_ids[-1] + 1
+        db.add(
+            ActualizerShard(
+                job=job,
+                product_id_from=id_from,
+                product_id_to=id_to,
+                status=SHARD_PENDING,
+                attempts=0,
+            )
+        )
+    db.commit()
+    logging.info(f"Planned {len(boundaries)} shards for {job}")
+    return len(boundaries)
+
+
+def claim_shard(db: Session, job: str, worker_id: str, lease_seconds: int | None = None) -> ActualizerShard | None:
+    """
+    Lease the next free shard of ``job``, skipping shards locked by other workers.
+    Shards with an expired lease are reclaimed.
+    """
+    lease_seconds = lease_seconds or settings.actualizer_lease_seconds
+    stmt = (
+        select(ActualizerShard)
+        .where(
+            ActualizerShard.job == job,
+            or_(
+                ActualizerShard.status == SHARD_PENDING,
+                and_(
+                    ActualizerShard.status == SHARD_LEASED,
+                    ActualizerShard.lease_expires_at < func.now(),
+                ),
+            ),
+        )
+        .order_by(ActualizerShard.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    shard = db.execute(stmt).scalar_one_or_none()
+    if shard is None:
+        db.commit()
+        return None
+
+    if shard.status == SHARD_LEASED:
+        logging.warning(f"Reclaiming shard {shard.id} of {job} from {shard.lease_owner}")
+    shard.status = SHARD_LEASED
+    shard.lease_owner = worker_id
+    shard.lease_expires_at = _lease_deadline(lease_seconds)
+    shard.attempts += 1
+    shard.updated_at = func.now()
+    db.commit()
+    db.refresh(shard)
+    return shard
+
+
+def renew_lease(db: Session, shard: ActualizerShard, worker_id: str, lease_seconds: int | None = None) -> bool:
+    """
+    Extend the lease of a shard still owned by ``worker_id``.
+    :return: False if the lease was lost to another worker.
+    """
+    lease_seconds = lease_seconds or settings.actualizer_lease_seconds
+    result = db.execute(
+        update(ActualizerShard)
+        .where(
+            ActualizerShard.id == shard.id,
+            ActualizerShard.lease_owner == worker_id,
+            ActualizerShard.status == SHARD_LEASED,
+        )
+        .values(lease_expires_at=_lease_deadline(lease_seconds), updated_at=func.now())
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def complete_shard(db: Session, shard: ActualizerShard, worker_id: str) -> bool:
+    result = db.execute(
+        update(ActualizerShard)
+        .where(
+            ActualizerShard.id == shard.id,
+            ActualizerShard.lease_owner == worker_id,
+            ActualizerShard.status == SHARD_LEASED,
+        )
+        .values(
+            status=SHARD_DONE,
+            lease_expires_at=None,
+            completed_at=func.now(),
+            updated_at=func.now(),
+        )
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def release_shard(db: Session, shard: ActualizerShard, worker_id: str) -> None:
+    """
+    Give a shard back without finishing it, e.g. when Keepa ran out of tokens.
+    """
+    db.execute(
+        update(ActualizerShard)
+        .where(
+            ActualizerShard.id == shard.id,
+            ActualizerShard.lease_owner == worker_id,
+            ActualizerShard.status == SHARD_LEASED,
+        )
+        .values(status=SHARD_PENDING, lease_owner=None, lease_expires_at=None, updated_at=func.now())
+    )
+    db.commit()
@@ -0,0 +1,100 @@
+"""
+Bulk catalog discovery through the Keepa product finder.
+
+Runs one finder query per PC-part category, drops ASINs we already store with a
+single set lookup and ingests the rest in 100-ASIN Keepa batches, one bulk insert per batch.
+"""
+
+from sqlalchemy import select
+import logging
+
+from app.models import Product
+from app.db.session import SessionLocal
+from app.crud.product import product_crud
+from app.schemas.product import ProductCreate
+from app.services.keepa import (
+    api,
+    ensure_category,
+    find_asins_in_categories,
+    parse_current_price_and_rating,
+)
+
+
+# Amazon US browse nodes for every component type the builder knows about.
+DISCOVERY_CATEGORIES: dict[str, list[int]] = {
+    "cpu": [229189],
+    "cpu_cooler": [3015427],
+    "gpu": [284822],
+    "motherboard": [1048424],
+    "ram": [172500],
+    "storage": [1292116, 1254762],
+    "psu": [1161760],
+    "case": [572238],
+}
+
+
+def _new_asins(db, found_asins: list[str]) -> list[str]:
+    # dict.fromkeys keeps finder order (best sellers first) while deduping
+    found = list(dict.fromkeys(found_asins))
+    existing = set(db.execute(select(Product.asin).where(Product.asin.in_(found))).scalars().all())
+    return [asin for asin in found if asin not in existing]
+
+
+def _ingest_batch(db, asins: list[str]) -> list[str]:
+    keepa_res = api.query(asins, stats=1, history=False, rating=True)
+    objs_in: list[ProductCreate] = []
+    for keepa_prod in keepa_res:
+        if not keepa_prod.get("title"):
+            continue
+        price, rating = parse_current_price_and_rating(keepa_prod)
+        objs_in.append(
+            ProductCreate(
+                asin=keepa_prod["asin"],
+                title=keepa_prod["title"],
+                price=price,
+                rating=rating,
+                category_id=ensure_category(keepa_prod, db),
+            )
+        )
+    return product_crud.bulk_create(db, objs_in=objs_in)
+
+
+def discover_products(component_types: list[str] | None = None, limit: int | None = None) -> int:
+    """
+    Find new products for the given component types and store them.
+    :param component_types: Subset of DISCOVERY_CATEGORIES keys, all of them by default.
+    :param limit: Max number of new ASINs to ingest in this run.
+    :return: Number of inserted products.
+    """
+    component_types = component_types or list(DISCOVERY_CATEGORIES)
+    found_asins: list[str] = []
+    for component_type in component_types:
+        try:
+            asins = find_asins_in_categories(DISCOVERY_CATEGORIES[component_type])
+        except Exception as e:
+            logging.warning(f"Keepa product finder failed for {component_type}: {e}")
+            continue
+        logging.info(f"Product finder returned {len(asins)} ASINs for {component_type}")
+        found_asins.extend(asins)
+
+    inserted_count = 0
+    with SessionLocal() as db:
+        try:
+            new_asins = _new_asins(db, found_asins)[:limit]
+            splited_lists_of_asins: list[list[str]] = [new_asins[i:i+100] for i in range(0,len(new_asins),100)]
+            for asins_list in splited_lists_of_asins:
+                try:
+                    inserted_count += len(_ingest_batch(db, asins_list))
+                except Exception as e:
+                    logging.warning(f"Error scraping products data, saving already scraped info: {e}")
+                    break
+        except Exception as e:
+            db.rollback()
+            logging.error(f"Error while discovering products from keepa: {e}")
+
+    logging.info(f"Discovered {inserted_count} new products")
+    return inserted_count
+
+
+if __name__ == "__main__":
+    discover_products()
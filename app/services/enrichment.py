@@ -0,0 +1,144 @@
+"""
+Enrichment stage for freshly scraped products.
+
+The scraper hands over ASINs of the products it just inserted, the stage groups them
+into 100-ASIN batches and fills price, rating and category from Keepa in a background
+thread, so a newly scraped catalog becomes usable by the builder without waiting for
+the next actualizer run.
+"""
+
+from datetime import datetime, timezone
+from queue import Queue, Empty
+from sqlalchemy import select
+import logging
+import threading
+import time
+
+from app.models import Product
+from app.db.session import SessionLocal
+from app.crud.product import product_crud
+from app.services.keepa import api, ensure_category, parse_current_price_and_rating
+
+KEEPA_BATCH_SIZE = 100
+
+
+def enrich_asins(asins: list[str]) -> int:
+    """
+    Fill price, rating and category of already stored products with one Keepa query.
+    :return: Number of updated products.
+    """
+    with SessionLocal() as db:
+        try:
+            products_ids_map: dict[str, int] = dict(
+                db.execute(select(Product.asin, Product.id).where(Product.asin.in_(asins))).all()
+            )
+            keepa_res = api.query(list(products_ids_map.keys()), stats=1, history=False, rating=True)
+            now = datetime.now(timezone.utc)
+            values: list[dict] = []
+            for keepa_prod in keepa_res:
+                product_id = products_ids_map.get(keepa_prod["asin"])
+                if product_id is None:
+                    continue
+                price, rating = parse_current_price_and_rating(keepa_prod)
+                values.append(
+                    {
+                        "id": product_id,
+                        "price": price,
+                        "rating": rating,
+                        "category_id": ensure_category(keepa_prod, db),
+                        "updated_at": now,
+                    }
+                )
+            product_crud.bulk_update(db, values=values)
+            return len(values)
+        except Exception as e:
+            db.rollback()
+            logging.error(f"Error while enriching products from keepa: {e}")
+            return 0
+
+
+class EnrichmentStage:
+    """
+    Background queue that enriches submitted ASINs in Keepa-sized batches.
+    """
+
+    _STOP = object()
+
+    def __init__(self, batch_size: int = KEEPA_BATCH_SIZE, flush_interval: float = 5.0):
+        """
+        :param batch_size: Max ASINs per Keepa query.
+        :param flush_interval: Seconds to wait for a batch to fill up before sending a partial one.
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enriched_count = 0
+        self._queue: Queue = Queue()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "EnrichmentStage":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="keepa-enrichment", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, asins: list[str]) -> None:
+        for asin in asins:
+            self._queue.put(asin)
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Flush whatever is queued and stop the worker thread.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(self._STOP)
+        if wait:
+            self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> "EnrichmentStage":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        batch: list[str] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except Empty:
+                item = None
+
+            if item is self._STOP:
+                self._flush(batch)
+                return
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            if len(batch) >= self.batch_size or (batch and time.monotonic() >= deadline):
+                self._flush(batch)
+                batch, deadline = [], None
+
+    def _flush(self, batch: list[str]) -> None:
+        if not batch:
+            return
+        self.enriched_count += enrich_asins(batch)
+        logging.info(f"Enriched {self.enriched_count} products so far")
+
+
+def enrich_pending_products() -> int:
+    """
+    Enrich every stored product that still has no price, e.g. after a crash mid-scrape.
+    """
+    with SessionLocal() as db:
+        asins: list[str] = db.execute(select(Product.asin).where(Product.price.is_(None))).scalars().all()
+    splited_lists_of_asins: list[list[str]] = [asins[i:i+KEEPA_BATCH_SIZE] for i in range(0,len(asins),KEEPA_BATCH_SIZE)]
+    return sum(enrich_asins(asins_list) for asins_list in splited_lists_of_asins)
+
+
+if __name__ == "__main__":
+    enrich_pending_products()
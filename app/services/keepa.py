@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from decimal import Decimal
 from math import isfinite
 from typing import Any, Union, Sequence
@@ -17,9 +18,19 @@ settings = get_settings()
 api = keepa.Keepa(settings.keepa_key)
 api.category_lookup
 api.search_for_categories
-api.product_finder
 keepa.ProductParams
 
+KEEPA_EPOCH_OFFSET_MINUTES = 21564000
+# Keepa accepts a limited number of category ids per product finder request.
+FINDER_CATEGORIES_PER_QUERY = 50
+
+
+class FinderResultsTruncated(Exception):
+    """
+    A product finder query returned KEEPA_FINDER_MAX_RESULTS ASINs, more may have matched.
+    """
+
+
 def _last_valid(seq: Sequence[Union[int, float, None]]) -> Union[int, float, None]:
     return next((v for v in reversed(seq) if v not in (None, -1)), None)
 
@@ -32,10 +43,36 @@ def _price_to_float(raw: Union[int, float, None]) -> float | None:
     return float(raw) if isfinite(raw) else None
 
 
+def _to_keepa_minutes(dt: datetime) -> int:
+    """
+    Keepa time is minutes since 2011-01-01 UTC.
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() // 60) - KEEPA_EPOCH_OFFSET_MINUTES
+
+
 def _safe_float(v: Union[int, float, None]) -> float | None:
     return round(float(v), 2) if v is not None and isfinite(float(v)) else None
 
 
+def parse_current_price_and_rating(keepa_prod: dict[str, Any]) -> tuple[float | None, float | None]:
+    """
+    Read current price and rating from a product queried with ``stats``.
+    """
+    cur_prod_state = (keepa_prod.get("stats_parsed") or {}).get("current")
+    if not cur_prod_state:
+        return None, None
+    prod_rate = round(cur_prod_state.get("RATING", float(0)), 1) or None
+    prod_price: float | None = (
+        cur_prod_state.get("AMAZON") or
+        cur_prod_state.get("NEW") or
+        cur_prod_state.get("USED") or
+        None
+    )
+    return prod_price, prod_rate
+
+
 def ensure_category(p: dict[str, Any], db: Session) -> int | None:
     # 1) Real Keepa catId, if > 0
     cat_ids = (
@@ -101,3 +138,50 @@ def fetch_product_from_keepa(asin: str, db: Session, domain: str = "US") -> Prod
         rating=rating,
         category_id=category_id,
     )
+
+
+def find_asins_with_price_change(category_keepa_ids: Sequence[int], since: datetime, domain: str = "US") -> set[str]:
+    """
+    Ask the Keepa product finder which products of the given categories changed
+    price since ``since``. Costs a flat fee per request instead of one token per ASIN.
+    :raise FinderResultsTruncated: A query hit the result cap, the changed set would be incomplete.
+    """
+    since_minutes = _to_keepa_minutes(since)
+    changed: set[str] = set()
+    for i in range(0, len(category_keepa_ids), FINDER_CATEGORIES_PER_QUERY):
+        product_parms = {
+            "categories_include": list(category_keepa_ids[i:i+FINDER_CATEGORIES_PER_QUERY]),
+            "lastPriceChange_gte": since_minutes,
+        }
+        asins = api.product_finder(
+            product_parms,
+            domain=domain,
+            n_products=settings.keepa_finder_max_results,
+        )
+        if len(asins) >= settings.keepa_finder_max_results:
+            raise FinderResultsTruncated(
+                f"Product finder returned {len(asins)} ASINs for categories {product_parms['categories_include']}"
+            )
+        changed.update(asins)
+    return changed
+
+
+def find_asins_in_categories(category_keepa_ids: Sequence[int], domain: str = "US") -> list[str]:
+    """
+    List ASINs of the given categories with the Keepa product finder, best sellers first.
+    """
+    found: list[str] = []
+    for i in range(0, len(category_keepa_ids), FINDER_CATEGORIES_PER_QUERY):
+        product_parms = {
+            "categories_include": list(category_keepa_ids[i:i+FINDER_CATEGORIES_PER_QUERY]),
+            "current_SALES_gte": 1,
+            "sort": [["current_SALES", "asc"]],
+        }
+        found.extend(
+            api.product_finder(
+                product_parms,
+                domain=domain,
+                n_products=settings.keepa_finder_max_results,
+            )
+        )
+    return found
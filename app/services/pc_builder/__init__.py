@@ -1,6 +1,9 @@
 from .builder import PCBuilder
+from .cache import build_cache, cached_build
 
 
 __all__ = [
-    "PCBuilder"
+    "PCBuilder",
+    "build_cache",
+    "cached_build",
 ]
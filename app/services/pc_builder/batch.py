@@ -0,0 +1,93 @@
+"""
+Batch evaluation of many build specs against one shared catalog snapshot.
+
+The catalog is loaded and indexed once (see `catalog.get_compatibility_index`),
+then every (budget, purpose, overrides) spec is built from the shared structures
+through the build cache, so repeated cells of a grid cost a lookup. Budget sweeps
+run on the same snapshot. Traced specs skip the cache, a trace describes an actual run.
+"""
+
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.models import Product
+from app.schemas.build import BuildSpec
+from app.services.pc_builder.builder import PCBuilder
+from app.services.pc_builder.cache import cached_build
+from app.services.pc_builder.catalog import get_compatibility_index, get_frontier_store
+
+
+def traced_build(session: Session, spec: BuildSpec) -> tuple[dict[str, Product] | None, str | None, dict]:
+    """
+    Build the spec from the shared catalog snapshot with tracing on, see `PCBuilder.build(trace=True)`.
+    Frontiers are not used, so the trace shows the whole candidate funnel.
+    :return: (build, error, trace)
+    """
+    builder = PCBuilder(
+        budget=spec.budget,
+        purpose=spec.purpose,
+        session=session,
+        admin_overrides=spec.overrides,
+        catalog_index=get_compatibility_index(session),
+    )
+    try:
+        build, error = builder.build(optimize=spec.optimize, trace=True), None
+    except Exception as e:
+        build, error = None, str(e)
+    return build, error, builder.trace.to_dict()
+
+
+def build_batch(
+    session: Session, specs: list[BuildSpec]
+) -> list[tuple[BuildSpec, dict[str, Product] | None, str | None, dict | None]]:
+    """
+    :return: (spec, build, error, trace) per spec, in input order. A failed spec doesn't fail the batch.
+        The trace is None unless the spec asks for it.
+    """
+    # Warm the shared snapshot once, every spec below reuses it.
+    get_compatibility_index(session)
+
+    results = []
+    for spec in specs:
+        if spec.trace:
+            results.append((spec, *traced_build(session, spec)))
+            continue
+        try:
+            build = cached_build(
+                budget=spec.budget,
+                purpose=spec.purpose,
+                session=session,
+                admin_overrides=spec.overrides,
+                optimize=spec.optimize,
+            )
+            results.append((spec, build, None, None))
+        except Exception as e:
+            logging.info(f"Batch build failed for {spec}: {e}")
+            results.append((spec, None, str(e), None))
+    return results
+
+
+def build_sweep(
+    session: Session,
+    purpose: str,
+    budgets: list[float],
+    admin_overrides: dict | None = None,
+) -> list[tuple[float, float, dict[str, Product]] | None]:
+    """
+    Best build at every budget point, see `PCBuilder.build_sweep`.
+    :return: (budget, total weighted score, build) per budget, None where nothing fits
+    """
+    catalog_index = get_compatibility_index(session)
+    builder = PCBuilder(
+        budget=max(budgets),
+        purpose=purpose,
+        session=session,
+        admin_overrides=admin_overrides,
+        catalog_index=catalog_index,
+        frontier=get_frontier_store(catalog_index),
+    )
+    return [
+        None if best is None else (budget, *best)
+        for budget, best in zip(budgets, builder.build_sweep(budgets))
+    ]
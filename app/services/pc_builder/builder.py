@@ -1,11 +1,65 @@
-from typing import List
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from time import perf_counter
+from typing import TYPE_CHECKING, List, Optional
+import threading
+import time
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager, joinedload, noload
 
-from app.services.pc_builder.enums import COMPONENTS_ENUM
+from app.core.config import get_settings
+from app.services.pc_builder.enums import (
+    COMPONENTS_ENUM,
+    COMPONENT_BUILD_ORDER,
+    COMPONENT_DEPENDENCIES,
+    COMPONENT_PREDECESSORS,
+    get_component_weights,
+)
 from app.services.pc_builder.rules import RuleBase, get_rules_for_purpose
 from app.services.pc_builder.selector import ComponentSelector
-from app.models import Product
+from app.services.pc_builder.optimizer import BuildOptimizer
+from app.services.pc_builder.sweep import sweep_budgets
+from app.services.pc_builder.trace import BuildTrace
+from app.models import ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE, Product
+
+if TYPE_CHECKING:
+    from app.services.pc_builder.compatibility import CompatibilityIndex
+    from app.services.pc_builder.frontier import FrontierStore
+    from app.services.pc_builder.shared_catalog import CatalogGeneration
+
+_selection_executor: Optional[ThreadPoolExecutor] = None
+_selection_executor_lock = threading.Lock()
+
+
+def _get_selection_executor() -> Optional[ThreadPoolExecutor]:
+    """
+    Shared pool for concurrent component selections, None when PC_BUILDER_WORKERS disables them.
+    """
+    global _selection_executor
+    workers = get_settings().pc_builder_workers
+    if workers <= 1:
+        return None
+    with _selection_executor_lock:
+        if _selection_executor is None:
+            _selection_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pc-builder")
+        return _selection_executor
+
+
+class NoSuitableComponent(ValueError):
+    """
+    Raised when no part, or no compatible set of parts, satisfies the budget, purpose and overrides.
+    """
+
+
+class BuildDeadlineExceeded(Exception):
+    """
+    Raised when a build's deadline passes before it completes.
+    Carries the best build found so far, which may miss some component types.
+    """
+
+    def __init__(self, components: dict[str, Product]):
+        super().__init__("Build deadline exceeded")
+        self.components = components
 
 
 class PCBuilder:
@@ -19,19 +73,34 @@ class PCBuilder:
         purpose: str,
         session: Session,
         admin_overrides: dict | None = None,
+        catalog_index: Optional["CompatibilityIndex"] = None,
+        frontier: Optional["FrontierStore"] = None,
+        deadline: Optional[float] = None,
+        shared_catalog: Optional["CatalogGeneration"] = None,
     ):
         """
         :param budget: Maximum total cost of the build
         :param purpose: Use-case type, e.g., "gaming", "office", "development"
         :param session: SQLAlchemy Async session
         :param admin_overrides: Optional dict to override default logic (e.g. {"cpu": "intel-i5-123456"})
+        :param catalog_index: Optional precomputed catalog, see `catalog.get_compatibility_index`
+        :param frontier: Optional Pareto frontiers to take candidates from, see `catalog.get_frontier_store`
+        :param deadline: Optional `time.monotonic()` value after which `build` stops
+            and raises `BuildDeadlineExceeded` with the parts found so far
+        :param shared_catalog: Optional memory-mapped catalog generation to select from,
+            see `shared_catalog.SharedCatalog.current`
         """
         self.budget = budget
         self.purpose = purpose
         self.session = session
         self.overrides = admin_overrides or {}
+        self.catalog_index = catalog_index
+        self.frontier = frontier
+        self.deadline = deadline
+        self.shared_catalog = shared_catalog
         self.rules: List[RuleBase] = []
         self.selected_components: dict[str, Product] = {}
+        self.trace: Optional[BuildTrace] = None
 
     def load_rules(self) -> None:
         """
@@ -39,37 +108,288 @@ class PCBuilder:
         """
         self.rules = get_rules_for_purpose(self.purpose)
 
-    def build(self) -> dict[str, Product]:
+    def build(self, optimize: bool = False, trace: bool = False) -> dict[str, Product]:
         """
         Run PC building logic.
+        :param optimize: Search for the best-scoring compatible build within budget
+            instead of picking each component greedily.
+        :param trace: Record per-stage timings and candidate counts in `self.trace` and log them,
+            also when the build fails. Traced builds are slower, see `trace.BuildTrace`.
+        :return: Dictionary of selected components
+        """
+        if not trace:
+            self.trace = None
+            return self._build(optimize)
+
+        self.trace = BuildTrace(self.purpose, self.budget, "optimal" if optimize else "greedy")
+        started = perf_counter()
+        try:
+            return self._build(optimize)
+        except Exception as e:
+            self.trace.error = str(e)
+            raise
+        finally:
+            self.trace.total_ms = (perf_counter() - started) * 1000
+            self.trace.emit()
+
+    def _build(self, optimize: bool) -> dict[str, Product]:
+        self.load_rules()
+
+        selector = self._make_selector()
+        if optimize:
+            return self._build_optimal(selector)
+
+        # Selections from the DB wait on their queries, independent ones overlap on the pool.
+        # Snapshot-backed selections (index, frontiers, shared catalog) are CPU-bound and gain nothing from threads.
+        # Traced builds stay sequential, so stage timings are not skewed by other selections.
+        executor = _get_selection_executor()
+        in_memory = self.catalog_index is not None or self.frontier is not None or self.shared_catalog is not None
+        if executor is not None and not in_memory and self.trace is None:
+            return self._build_concurrently(executor)
+
+        # Parts are picked in dependency order, so each one is checked against everything it depends on.
+        for component_type in COMPONENT_BUILD_ORDER:
+            self._check_deadline(self.selected_components)
+            if component_type in self.overrides:
+                product = self._get_product_by_asin(self.overrides[component_type], component_type)
+            else:
+                product = self._select(selector, component_type)
+
+            if not product:
+                raise NoSuitableComponent(f"Could not find suitable {component_type}")
+            self.selected_components[component_type] = product
+
+        self.selected_components = {component_type: self.selected_components[component_type] for component_type in COMPONENTS_ENUM}
+        return self.selected_components
+
+    def _time_left(self) -> Optional[float]:
+        return None if self.deadline is None else max(self.deadline - time.monotonic(), 0.0)
+
+    def _check_deadline(self, selected: dict[str, Product]) -> None:
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BuildDeadlineExceeded(
+                {component_type: selected[component_type] for component_type in COMPONENTS_ENUM if component_type in selected}
+            )
+
+    def _build_concurrently(self, executor: ThreadPoolExecutor) -> dict[str, Product]:
+        """
+        Greedy build with every selection started as soon as its `COMPONENT_PREDECESSORS` are picked,
+        so latency follows the longest dependency chain (cpu, motherboard, ram, psu) instead of all eight.
+        Each selection runs in its own session; the picked products are merged into the builder's session.
+        """
+        bind = self.session.get_bind()
+
+        def select_component(component_type: str, selected_components: dict[str, Product]) -> Optional[Product]:
+            with Session(bind=bind) as session:
+                if component_type in self.overrides:
+                    return self._get_product_by_asin(self.overrides[component_type], component_type, session)
+                return self._select(self._make_selector(session), component_type, selected_components)
+
+        selected: dict[str, Product] = {}
+        remaining = list(COMPONENT_BUILD_ORDER)
+        pending: dict[Future, str] = {}
+        try:
+            while remaining or pending:
+                for component_type in [c for c in remaining if COMPONENT_PREDECESSORS[c] <= selected.keys()]:
+                    remaining.remove(component_type)
+                    pending[executor.submit(select_component, component_type, dict(selected))] = component_type
+
+                done, _ = wait(pending, timeout=self._time_left(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    component_type = pending.pop(future)
+                    product = future.result()
+                    if not product:
+                        raise NoSuitableComponent(f"Could not find suitable {component_type}")
+                    selected[component_type] = product
+                if remaining or pending:
+                    self._check_deadline({
+                        component_type: self.session.merge(product, load=False)
+                        for component_type, product in selected.items()
+                    })
+        finally:
+            for future in pending:
+                future.cancel()
+
+        self.selected_components = {
+            component_type: self.session.merge(selected[component_type], load=False)
+            for component_type in COMPONENTS_ENUM
+        }
+        return self.selected_components
+
+    def rebuild(self, previous_build: dict[str, Product], changed: dict[str, str | None]) -> dict[str, Product]:
+        """
+        Update a build after some of its parts changed, reusing every part the change doesn't invalidate.
+        Parts depending on a changed part (see `COMPONENT_DEPENDENCIES`) are checked again and only the
+        incompatible ones are reselected, which in turn re-checks their own dependents.
+        :param previous_build: Build returned by `build`
+        :param changed: Component type to the ASIN replacing it, or None to reselect that part
         :return: Dictionary of selected components
         """
         self.load_rules()
+        selector = self._make_selector()
+
+        selected = dict(previous_build)
+        pinned = {component_type for component_type in self.overrides if component_type not in changed}
+        for component_type, asin in changed.items():
+            if asin is None:
+                selected.pop(component_type, None)
+                continue
+            product = self._get_product_by_asin(asin, component_type)
+            if not product:
+                raise NoSuitableComponent(f"Could not find {component_type} {asin}")
+            selected[component_type] = product
+            pinned.add(component_type)
+
+        dirty = set(changed)
+        for component_type in COMPONENT_BUILD_ORDER:
+            product = selected.get(component_type)
+            if product is not None and not COMPONENT_DEPENDENCIES[component_type] & dirty:
+                continue
 
-        selector = ComponentSelector(
+            others = {other: part for other, part in selected.items() if other != component_type}
+            if product is not None:
+                selector.component_type = component_type
+                if selector.is_compatible_with(product, others):
+                    continue
+                if component_type in pinned:
+                    raise NoSuitableComponent(f"Chosen {component_type} is not compatible with the rest of the build")
+
+            product = self._select(selector, component_type, others)
+            if not product:
+                raise NoSuitableComponent(f"Could not find suitable {component_type}")
+            selected[component_type] = product
+            dirty.add(component_type)
+
+        self.selected_components = {component_type: selected[component_type] for component_type in COMPONENTS_ENUM}
+        return self.selected_components
+
+    def _make_selector(self, session: Optional[Session] = None) -> ComponentSelector:
+        frontier = None
+        if self.frontier is not None:
+            frontier = partial(self.frontier.candidates, purpose=self.purpose)
+        return ComponentSelector(
             budget=self.budget,
             rules=self.rules,
-            session=self.session,
+            session=session or self.session,
+            catalog_index=self.catalog_index,
+            frontier=frontier,
+            trace=self.trace,
+            shared_catalog=self.shared_catalog,
         )
+
+    def _select(
+        self,
+        selector: ComponentSelector,
+        component_type: str,
+        selected_components: dict[str, Product] | None = None,
+    ) -> Optional[Product]:
+        selector.component_type = component_type
+        selector.selected_components = self.selected_components if selected_components is None else selected_components
+        return selector.select_best()
+
+    def _load_candidates(self, selector: ComponentSelector) -> dict[str, list[Product]]:
+        """
+        Rule-filtered candidates for every component type, overrides pin a single product.
+        """
+        candidates: dict[str, list[Product]] = {}
         for component_type in COMPONENTS_ENUM:
+            self._check_deadline({})
             if component_type in self.overrides:
-                product = self._get_product_by_asin(self.overrides[component_type])
+                product = self._get_product_by_asin(self.overrides[component_type], component_type)
+                candidates[component_type] = [product] if product else []
             else:
                 selector.component_type = component_type
-                selector.selected_components = self.selected_components
-                product = selector.select_best()
-
-            if not product:
-                raise Exception(f"Could not find suitable {component_type}")
-            self.selected_components[component_type] = product
+                candidates[component_type] = selector.get_candidates()
+            if not candidates[component_type]:
+                raise NoSuitableComponent(f"Could not find suitable {component_type}")
+        return candidates
 
+    def _build_optimal(self, selector: ComponentSelector) -> dict[str, Product]:
+        optimizer = BuildOptimizer(
+            budget=self.budget,
+            selector=selector,
+            candidates=self._load_candidates(selector),
+            weights=get_component_weights(self.purpose),
+            deadline=self.deadline,
+        )
+        started = perf_counter()
+        best = optimizer.solve()
+        if self.trace is not None:
+            self.trace.search_ms = (perf_counter() - started) * 1000
+        if optimizer.timed_out:
+            raise BuildDeadlineExceeded(
+                {component_type: best[component_type] for component_type in COMPONENTS_ENUM} if best else {}
+            )
+        if best is None:
+            raise NoSuitableComponent("Could not find a compatible build within budget")
+        self.selected_components = {component_type: best[component_type] for component_type in COMPONENTS_ENUM}
         return self.selected_components
 
-    def _get_product_by_asin(self, asin: str) -> Product:
+    def build_top_k(self, k: int) -> list[dict[str, Product]]:
+        """
+        Return up to k alternative builds, best first, from a single search.
+        Candidates and compatibility data are loaded once for all of them.
+        """
+        self.load_rules()
+        selector = self._make_selector()
+        optimizer = BuildOptimizer(
+            budget=self.budget,
+            selector=selector,
+            candidates=self._load_candidates(selector),
+            weights=get_component_weights(self.purpose),
+        )
+        builds = [
+            {component_type: build[component_type] for component_type in COMPONENTS_ENUM}
+            for _, build in optimizer.top_k(k)
+        ]
+        if not builds:
+            raise NoSuitableComponent("Could not find a compatible build within budget")
+        self.selected_components = builds[0]
+        return builds
+
+    def build_sweep(self, budgets: list[float], price_step: float = 1.0) -> list[Optional[tuple[float, dict[str, Product]]]]:
+        """
+        Best build for each budget, from dynamic-programming passes over all of them (see `sweep`).
+        Builds are optimal at exact prices, ``price_step`` is the resolution of the DP.
+        The builder's own budget is ignored.
+        :return: (total weighted score, build) per budget, None where no compatible build fits
+        """
+        self.load_rules()
+        selector = self._make_selector()
+        sweep = sweep_budgets(
+            budgets,
+            selector=selector,
+            candidates=self._load_candidates(selector),
+            weights=get_component_weights(self.purpose),
+            price_step=price_step,
+        )
+        results = []
+        for best in sweep:
+            if best is None:
+                results.append(None)
+                continue
+            score, build = best
+            results.append((score, {component_type: build[component_type] for component_type in COMPONENTS_ENUM}))
+        return results
+
+    def _get_product_by_asin(self, asin: str, component_type: str, session: Optional[Session] = None) -> Product:
         """
         Fetch a product directly by ASIN (used for manual overrides).
+        :return: None if there is no such product of the component type.
         """
-        result = self.session.execute(
-            select(Product).where(Product.asin == asin)
+        if self.catalog_index is not None:
+            product = self.catalog_index.by_asin.get(asin)
+            # A product of another type has no attrs row of this one
+            if product is None or getattr(product, ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE[component_type]) is None:
+                return None
+            return product
+        attrs_relationship = ComponentSelector.component_types_to_attr_relationship_mapping[component_type]
+        result = (session or self.session).execute(
+            # Loaded like catalog snapshot products, so the build can be cached and used detached.
+            # The inner join leaves out products of other types.
+            select(Product)
+            .join(attrs_relationship)
+            .options(contains_eager(attrs_relationship), joinedload(Product.category), noload("*"))
+            .where(Product.asin == asin)
         )
-        return result.scalar_one_or_none()
+        return result.unique().scalar_one_or_none()
@@ -0,0 +1,195 @@
+"""
+Build-result cache in front of `PCBuilder`.
+
+Entries are keyed on (purpose, budget bucket, normalized overrides, build mode,
+catalog version the build ran on), so a build is served only as long as its catalog
+snapshot is the one builds run on. Concurrent identical requests are coalesced: only the first one
+computes, the others wait for its result.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Hashable, Optional
+import logging
+import math
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models import Product
+from app.services.pc_builder.builder import BuildDeadlineExceeded, PCBuilder
+from app.services.pc_builder.catalog import get_compatibility_index, get_frontier_store
+from app.services.pc_builder.shared_catalog import get_shared_catalog
+
+settings = get_settings()
+
+
+class BuildCache:
+    """
+    Thread-safe LRU cache with single-flight computation and hit metrics.
+    """
+
+    def __init__(self, max_entries: int, budget_step: float):
+        """
+        :param max_entries: Number of builds kept before the least recently used is dropped.
+        :param budget_step: Budgets are rounded down to a multiple of this step.
+        """
+        self.max_entries = max_entries
+        self.budget_step = budget_step
+        self._entries: OrderedDict[Hashable, tuple[object, float]] = OrderedDict()
+        self._in_flight: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.saved_seconds = 0.0
+
+    def budget_bucket(self, budget: float) -> float:
+        """
+        Round down, so a build computed for the bucket never exceeds any budget in it.
+        """
+        return math.floor(budget / self.budget_step) * self.budget_step
+
+    def make_key(self, purpose: str, budget: float, overrides: Optional[dict], version: int, mode: str) -> tuple:
+        normalized_overrides = tuple(sorted((overrides or {}).items()))
+        return (purpose, self.budget_bucket(budget), normalized_overrides, mode, version)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object], deadline: Optional[float] = None):
+        """
+        Cached value of the key, computed once however many callers ask for it concurrently.
+        :param deadline: `time.monotonic()` value after which to stop waiting for another caller's computation
+        :raise TimeoutError: The deadline passed while waiting, the computation goes on for the other callers.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                value, compute_seconds = self._entries[key]
+                self.hits += 1
+                self.saved_seconds += compute_seconds
+                return value
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._in_flight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            value, compute_seconds = future.result(timeout=timeout)
+            with self._lock:
+                self.saved_seconds += compute_seconds
+            return value
+
+        started = time.perf_counter()
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        compute_seconds = time.perf_counter() - started
+
+        with self._lock:
+            self._entries[key] = (value, compute_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            del self._in_flight[key]
+        future.set_result((value, compute_seconds))
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+build_cache = BuildCache(
+    max_entries=settings.build_cache_size,
+    budget_step=settings.build_cache_budget_step,
+)
+
+
+def cached_build(
+    budget: float,
+    purpose: str,
+    session: Session,
+    admin_overrides: dict | None = None,
+    optimize: bool = False,
+    deadline: float | None = None,
+) -> dict[str, Product]:
+    """
+    `PCBuilder.build` through the build cache. The build runs for the budget bucket,
+    on the shared catalog snapshot, so cached products are safe to hand out across sessions.
+    A build cut short by its deadline raises `BuildDeadlineExceeded` and is not cached.
+    Greedy builds select from the shared catalog when one is published, keyed on its version,
+    other builds are keyed on the version of the compatibility index they run on.
+    Before the first index load finishes, builds select from the database and aren't cached.
+    """
+    shared_catalog = get_shared_catalog()
+    generation = shared_catalog.current() if shared_catalog is not None and not optimize else None
+    catalog_index = None
+    if generation is not None:
+        version = generation.version
+    else:
+        try:
+            catalog_index = get_compatibility_index(session, deadline=deadline)
+        except TimeoutError:
+            logging.info("Compatibility index is still loading, building from the database")
+        version = catalog_index.version if catalog_index is not None else None
+
+    def compute() -> dict[str, Product]:
+        bucket_budget = build_cache.budget_bucket(budget) if version is not None else budget
+        if generation is not None:
+            # Picked products are loaded in a session of their own, the caller's commits never expire them
+            with Session(bind=session.get_bind()) as build_session:
+                builder = PCBuilder(
+                    budget=bucket_budget,
+                    purpose=purpose,
+                    session=build_session,
+                    admin_overrides=admin_overrides,
+                    deadline=deadline,
+                    shared_catalog=generation,
+                )
+                try:
+                    return builder.build(optimize=optimize)
+                finally:
+                    build_session.expunge_all()
+
+        builder = PCBuilder(
+            budget=bucket_budget,
+            purpose=purpose,
+            session=session,
+            admin_overrides=admin_overrides,
+            catalog_index=catalog_index,
+            frontier=get_frontier_store(catalog_index) if catalog_index is not None else None,
+            deadline=deadline,
+        )
+        return builder.build(optimize=optimize)
+
+    if version is None:
+        return compute()
+
+    key = build_cache.make_key(purpose, budget, admin_overrides, version, "optimal" if optimize else "greedy")
+    try:
+        return dict(build_cache.get_or_compute(key, compute, deadline=deadline))
+    except TimeoutError:
+        # Waited on an identical build in progress, nothing of it to return yet
+        raise BuildDeadlineExceeded({})
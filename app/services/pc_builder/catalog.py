@@ -0,0 +1,149 @@
+"""
+In-memory snapshot of the component catalog.
+
+The snapshot holds every priced product of each component type with its attrs and
+category loaded, detached from any session so it can be shared between builds and
+threads. It is rebuilt in the background whenever the catalog version changes.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session, contains_eager, joinedload, noload
+
+from app.models import Product
+from app.services.pc_builder.enums import COMPONENTS_ENUM
+from app.services.pc_builder.selector import ComponentSelector
+from app.services.pc_builder.compatibility import CompatibilityIndex
+from app.services.pc_builder.frontier import FrontierStore
+
+
+def catalog_version(session: Session) -> Optional[int]:
+    """
+    Current catalog version, bumped by triggers inside every transaction writing to products
+    or attrs, so a snapshot sees the version matching the rows it sees.
+    :return: None if the database doesn't track versions (non-Postgres), callers must not cache then.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+    return session.scalar(text("SELECT version FROM catalog_version WHERE id = 1"))
+
+
+def load_versioned_catalog(session: Session) -> tuple[Optional[int], dict[str, list[Product]]]:
+    """
+    Load all priced products per component type, ordered by id, with the catalog version they are at.
+    Version and products are read in one REPEATABLE READ snapshot, so a write committing meanwhile
+    can't get its version attached to the catalog as it was before.
+    Uses its own short-lived session, so the returned objects never get expired by the caller's commits.
+    """
+    bind = session.get_bind()
+    if bind.dialect.name == "postgresql":
+        bind = bind.execution_options(isolation_level="REPEATABLE READ")
+
+    catalog: dict[str, list[Product]] = {}
+    with Session(bind=bind) as snapshot_session:
+        version = catalog_version(snapshot_session)
+        for component_type in COMPONENTS_ENUM:
+            attrs_relationship = ComponentSelector.component_types_to_attr_relationship_mapping[component_type]
+            stmt = (
+                select(Product)
+                .join(attrs_relationship)
+                # Other attrs relationships are set to None, detached products must never lazy-load.
+                .options(contains_eager(attrs_relationship), joinedload(Product.category), noload("*"))
+                .where(Product.price.isnot(None))
+                .order_by(Product.id)
+            )
+            catalog[component_type] = snapshot_session.execute(stmt).unique().scalars().all()
+        snapshot_session.expunge_all()
+    return version, catalog
+
+
+def load_catalog(session: Session) -> dict[str, list[Product]]:
+    """
+    Priced products per component type, see `load_versioned_catalog`.
+    """
+    return load_versioned_catalog(session)[1]
+
+
+_index_lock = threading.Lock()
+_cached_index: Optional[CompatibilityIndex] = None
+_cached_version: Optional[int] = None
+_cached_frontier: Optional[FrontierStore] = None
+# Reloads run one at a time in the background, builds keep using the previous index meanwhile
+_load_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalog-load")
+_loading: Optional[Future] = None
+
+
+def _reload_index(bind) -> None:
+    global _cached_index, _cached_version, _cached_frontier, _loading
+    try:
+        with Session(bind=bind) as session:
+            version, catalog = load_versioned_catalog(session)
+        index = CompatibilityIndex(catalog, version=version)
+        frontier = FrontierStore(index.catalog)
+        with _index_lock:
+            _cached_index = index
+            _cached_version = version
+            _cached_frontier = frontier
+    except Exception as e:
+        logging.error(f"Error while reloading the compatibility index: {e}")
+        raise
+    finally:
+        with _index_lock:
+            _loading = None
+
+
+def get_compatibility_index(session: Session, deadline: Optional[float] = None) -> CompatibilityIndex:
+    """
+    Compatibility index of the catalog, rebuilt in the background when the catalog version moved.
+    Until the rebuild finishes callers keep getting the previous index, only the first load is waited for.
+    The index may be older than the session's catalog, `index.version` tells which catalog it holds.
+    :param deadline: `time.monotonic()` value after which to stop waiting for the first load
+    :raise TimeoutError: No index was loaded yet and the deadline passed first, the load keeps running.
+    """
+    global _cached_index, _cached_version, _cached_frontier, _loading
+    version = catalog_version(session)
+    if version is None:
+        # Nothing to tell snapshots apart, every call reloads
+        with _index_lock:
+            _, catalog = load_versioned_catalog(session)
+            _cached_index = CompatibilityIndex(catalog, version=None)
+            _cached_version = None
+            _cached_frontier = FrontierStore(_cached_index.catalog)
+            return _cached_index
+
+    while True:
+        with _index_lock:
+            # Cached under the version read with the products, which may be newer than `version`
+            outdated = _cached_index is None or _cached_version is None or _cached_version < version
+            if outdated and _loading is None:
+                _loading = _load_executor.submit(_reload_index, session.get_bind())
+            if _cached_index is not None:
+                return _cached_index
+            loading = _loading
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        # Also raises the load's own error
+        loading.result(timeout=timeout)
+
+
+def get_frontier_store(index: CompatibilityIndex) -> FrontierStore:
+    """
+    Pareto frontiers over the same snapshot as the index from `get_compatibility_index`.
+    """
+    with _index_lock:
+        if _cached_index is index:
+            return _cached_frontier
+    # An index that was never cached, or was replaced meanwhile
+    return FrontierStore(index.catalog)
+
+
+def invalidate_compatibility_index() -> None:
+    global _cached_index, _cached_version, _cached_frontier
+    with _index_lock:
+        _cached_index = None
+        _cached_version = None
+        _cached_frontier = None
@@ -0,0 +1,179 @@
+"""
+Precomputed compatibility index over a catalog snapshot.
+
+Replaces per-candidate `ComponentSelector._is_compatible` scans with lookups:
+hash buckets keyed by socket and RAM type, and sorted threshold arrays for
+RAM speed, GPU length against case limits and PSU power. Lookups return
+candidates in catalog order, so selection tie-breaks match the scan.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Optional
+
+import numpy as np
+
+from app.models import Product
+from app.services.pc_builder.selector import ComponentSelector
+
+
+def _as_float(value) -> float:
+    return float("nan") if value is None else float(value)
+
+
+class _SortedBucket:
+    """
+    Catalog positions sorted by one numeric key, missing keys left out.
+    """
+
+    def __init__(self, positions: list[int], keys: list):
+        pairs = sorted((key, position) for position, key in zip(positions, keys) if key is not None)
+        self.keys = [key for key, _ in pairs]
+        self.positions = np.array([position for _, position in pairs], dtype=np.intp)
+
+    def at_most(self, limit) -> np.ndarray:
+        return self.positions[:bisect_right(self.keys, limit)]
+
+    def at_least(self, limit) -> np.ndarray:
+        return self.positions[bisect_left(self.keys, limit):]
+
+
+class CompatibilityIndex:
+    """
+    Answers "which products of type X are compatible with these selected parts".
+    """
+
+    def __init__(self, catalog: dict[str, list[Product]], version: Optional[int] = None):
+        """
+        :param catalog: Priced products per component type, see `catalog.load_catalog`.
+        :param version: Catalog version the index was built from.
+        """
+        self.catalog = catalog
+        self.version = version
+
+        cpus = catalog.get("cpu", [])
+        self.cpus_by_socket: dict[str, np.ndarray] = self._buckets(cpus, lambda p: p.cpu_attributes.socket_type)
+
+        motherboards = catalog.get("motherboard", [])
+        self.motherboards_by_socket = self._buckets(motherboards, lambda p: p.motherboard_attributes.socket_type)
+
+        rams = catalog.get("ram", [])
+        self.rams_by_type: dict[str, _SortedBucket] = {}
+        rams_by_type: dict[str, list[int]] = defaultdict(list)
+        for position, product in enumerate(rams):
+            rams_by_type[product.ram_attributes.ram_type].append(position)
+        for ram_type, positions in rams_by_type.items():
+            self.rams_by_type[ram_type] = _SortedBucket(positions, [rams[i].ram_attributes.ram_speed for i in positions])
+        self.ram_total_memory = np.array([_as_float(p.ram_attributes.total_memory) for p in rams], dtype=np.float64)
+        self.ram_quantity = np.array([_as_float(p.ram_attributes.quantity) for p in rams], dtype=np.float64)
+
+        cases = catalog.get("case", [])
+        self.cases_without_limit = np.array(
+            [i for i, p in enumerate(cases) if not p.case_attributes.cabinet_type], dtype=np.intp
+        )
+        limited = [i for i, p in enumerate(cases) if p.case_attributes.cabinet_type]
+        self.cases_by_gpu_limit = _SortedBucket(
+            limited,
+            [ComponentSelector.case_gpu_length_limits.get(cases[i].case_attributes.cabinet_type, ComponentSelector.default_case_gpu_length_limit) for i in limited],
+        )
+
+        self.by_asin: dict[str, Product] = {
+            product.asin: product for products in catalog.values() for product in products
+        }
+
+        psus = catalog.get("psu", [])
+        self.psus_by_power = _SortedBucket(list(range(len(psus))), [p.power_supply_attributes.power for p in psus])
+
+    @staticmethod
+    def _buckets(products: list[Product], key) -> dict:
+        buckets: dict = defaultdict(list)
+        for position, product in enumerate(products):
+            buckets[key(product)].append(position)
+        return {bucket_key: np.array(positions, dtype=np.intp) for bucket_key, positions in buckets.items()}
+
+    def _products(self, component_type: str, positions: Optional[np.ndarray]) -> list[Product]:
+        products = self.catalog.get(component_type, [])
+        if positions is None:
+            return list(products)
+        return [products[i] for i in np.sort(positions)]
+
+    def _motherboard_positions(self, cpu: Product) -> np.ndarray:
+        return self.motherboards_by_socket.get(cpu.cpu_attributes.socket_type, np.empty(0, dtype=np.intp))
+
+    def _cpu_positions(self, motherboard: Product) -> np.ndarray:
+        return self.cpus_by_socket.get(motherboard.motherboard_attributes.socket_type, np.empty(0, dtype=np.intp))
+
+    def _ram_positions(self, cpu: Optional[Product], motherboard: Optional[Product]) -> np.ndarray:
+        if cpu:
+            bucket = self.rams_by_type.get(cpu.cpu_attributes.memory_type)
+            if bucket is None or cpu.cpu_attributes.memory_speed is None:
+                return np.empty(0, dtype=np.intp)
+            positions = bucket.at_most(cpu.cpu_attributes.memory_speed)
+        else:
+            positions = np.arange(len(self.catalog.get("ram", [])), dtype=np.intp)
+
+        if motherboard:
+            mb_attrs = motherboard.motherboard_attributes
+            if mb_attrs.max_ram_support is None or mb_attrs.ram_slots is None:
+                return np.empty(0, dtype=np.intp)
+            # NaN compares False, just like the TypeError `_is_compatible` turns into a rejection
+            mask = (self.ram_total_memory[positions] <= mb_attrs.max_ram_support) & (self.ram_quantity[positions] <= mb_attrs.ram_slots)
+            positions = positions[mask]
+        return positions
+
+    def _case_positions(self, gpu: Product) -> np.ndarray:
+        length = gpu.gpu_attributes.length
+        fitting = self.cases_by_gpu_limit.at_least(length) if length is not None else np.empty(0, dtype=np.intp)
+        return np.concatenate([self.cases_without_limit, fitting])
+
+    def _positions(self, component_type: str, selected_components: dict[str, Product], min_power: int) -> Optional[np.ndarray]:
+        """
+        Catalog positions of compatible products, None if all of them are.
+        """
+        if not selected_components:
+            return None
+        if component_type == "motherboard" and (cpu := selected_components.get("cpu")):
+            return self._motherboard_positions(cpu)
+        if component_type == "cpu" and (mb := selected_components.get("motherboard")):
+            return self._cpu_positions(mb)
+        if component_type == "ram":
+            return self._ram_positions(selected_components.get("cpu"), selected_components.get("motherboard"))
+        if component_type == "case" and (gpu := selected_components.get("gpu")):
+            return self._case_positions(gpu)
+        if component_type == "psu":
+            return self.psus_by_power.at_least(min_power)
+        return None
+
+    def motherboards_for(self, cpu: Product) -> list[Product]:
+        return self._products("motherboard", self._motherboard_positions(cpu))
+
+    def cpus_for(self, motherboard: Product) -> list[Product]:
+        return self._products("cpu", self._cpu_positions(motherboard))
+
+    def rams_for(self, cpu: Optional[Product] = None, motherboard: Optional[Product] = None) -> list[Product]:
+        return self._products("ram", self._ram_positions(cpu, motherboard))
+
+    def cases_for(self, gpu: Product) -> list[Product]:
+        return self._products("case", self._case_positions(gpu))
+
+    def psus_for(self, min_power: int) -> list[Product]:
+        return self._products("psu", self.psus_by_power.at_least(min_power))
+
+    def compatible(self, component_type: str, selected_components: dict[str, Product], min_power: int) -> list[Product]:
+        """
+        Products of ``component_type`` that `ComponentSelector._is_compatible` would accept.
+        :param min_power: Estimated power draw of the build, for PSUs.
+        """
+        return self._products(component_type, self._positions(component_type, selected_components, min_power))
+
+    def compatible_bitset(self, component_type: str, selected_components: dict[str, Product], min_power: int) -> int:
+        """
+        Same as `compatible`, as a bitset over catalog positions of ``component_type``.
+        """
+        count = len(self.catalog.get(component_type, []))
+        positions = self._positions(component_type, selected_components, min_power)
+        if positions is None:
+            return (1 << count) - 1
+        mask = np.zeros(count, dtype=bool)
+        mask[positions] = True
+        return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
@@ -1 +1,57 @@
-COMPONENTS_ENUM = ["cpu", "cpu_cooler", "gpu", "motherboard", "ram", "storage", "psu", "case"]
\ No newline at end of file
+from graphlib import TopologicalSorter
+
+COMPONENTS_ENUM = ["cpu", "cpu_cooler", "gpu", "motherboard", "ram", "storage", "psu", "case"]
+
+# Parts each component type has to be compatible with, see `ComponentSelector._is_compatible`.
+# Changing one of them can invalidate the component. PSU sizing depends on the whole build.
+COMPONENT_DEPENDENCIES: dict[str, set[str]] = {
+    "cpu": {"motherboard"},
+    "cpu_cooler": set(),
+    "gpu": set(),
+    "motherboard": {"cpu"},
+    "ram": {"cpu", "motherboard"},
+    "storage": set(),
+    "psu": {"cpu", "cpu_cooler", "gpu", "motherboard", "ram", "storage", "case"},
+    "case": {"gpu"},
+}
+
+
+def _component_predecessors() -> dict[str, set[str]]:
+    """
+    `COMPONENT_DEPENDENCIES` as a DAG. Mutual dependencies (cpu and motherboard)
+    are broken in favour of the type listed first in `COMPONENTS_ENUM`.
+    """
+    return {
+        component_type: {
+            dependency for dependency in COMPONENT_DEPENDENCIES[component_type]
+            if component_type not in COMPONENT_DEPENDENCIES[dependency]
+            or COMPONENTS_ENUM.index(dependency) < COMPONENTS_ENUM.index(component_type)
+        }
+        for component_type in COMPONENTS_ENUM
+    }
+
+
+# Parts that have to be picked before each component type. Types with no path between them are independent.
+COMPONENT_PREDECESSORS = _component_predecessors()
+
+
+def _component_build_order() -> list[str]:
+    sorter = TopologicalSorter()
+    for component_type in COMPONENTS_ENUM:
+        sorter.add(component_type, *sorted(COMPONENT_PREDECESSORS[component_type], key=COMPONENTS_ENUM.index))
+    return list(sorter.static_order())
+
+
+COMPONENT_BUILD_ORDER = _component_build_order()
+
+# How much each component type's score counts towards a build's total, per purpose.
+PURPOSE_COMPONENT_WEIGHTS: dict[str, dict[str, float]] = {
+    "gaming": {"cpu": 1.0, "cpu_cooler": 1.0, "gpu": 2.0, "motherboard": 1.0, "ram": 1.0, "storage": 0.5, "psu": 0.5, "case": 1.0},
+    "office": {"cpu": 1.0, "cpu_cooler": 1.0, "gpu": 0.2, "motherboard": 1.0, "ram": 1.0, "storage": 1.0, "psu": 0.5, "case": 1.0},
+    "development": {"cpu": 2.0, "cpu_cooler": 1.0, "gpu": 0.5, "motherboard": 1.0, "ram": 1.5, "storage": 1.0, "psu": 0.5, "case": 1.0},
+}
+DEFAULT_COMPONENT_WEIGHTS: dict[str, float] = {component_type: 1.0 for component_type in COMPONENTS_ENUM}
+
+
+def get_component_weights(purpose: str) -> dict[str, float]:
+    return PURPOSE_COMPONENT_WEIGHTS.get(purpose, DEFAULT_COMPONENT_WEIGHTS)
@@ -0,0 +1,111 @@
+"""
+Price/score Pareto frontiers of component candidates.
+
+Within a compatibility bucket (products with the same `ComponentSelector.compatibility_key`,
+compatible with exactly the same parts) a product is dominated when another one costs no
+more, scores no less and ranks ahead of it in `ComponentSelector` selection order. Such a
+product can never be selected, nor be part of an optimal build, so the selector and the
+optimizer only need to look at each bucket's frontier.
+
+Frontiers are kept per (component type, purpose), since purpose rules decide which products
+enter the buckets, and computed on first use. A new catalog version gets a new store, see
+`catalog.get_compatibility_index`.
+"""
+
+from collections import defaultdict
+import threading
+
+from app.models import Product
+from app.services.pc_builder.rules import get_rules_for_purpose
+from app.services.pc_builder.scoring import extract_columns, price_weighted_scores, quality_scores
+from app.services.pc_builder.selector import ComponentSelector
+
+
+def pareto_frontier(products: list[Product], component_type: str) -> list[Product]:
+    """
+    Non-dominated products of one compatibility bucket, in id order.
+    """
+    if len(products) <= 1:
+        return list(products)
+
+    columns = extract_columns(products, component_type)
+    scores = quality_scores(columns, component_type)
+    # Same arithmetic as the selector, so rank comparisons below match its choice exactly
+    ratios = price_weighted_scores(columns, component_type)
+
+    def ranks_ahead(a: int, b: int) -> bool:
+        return ratios[a] > ratios[b] or (ratios[a] == ratios[b] and products[a].id < products[b].id)
+
+    # Cheapest first, so every product that could dominate the current one was already seen.
+    order = sorted(range(len(products)), key=lambda i: (products[i].price, -scores[i], products[i].id))
+    kept = []
+    champion = None
+    for i in order:
+        if champion is not None and scores[champion] >= scores[i] and ranks_ahead(champion, i):
+            continue
+        kept.append(i)
+        if champion is None or scores[i] > scores[champion] or (scores[i] == scores[champion] and ranks_ahead(i, champion)):
+            champion = i
+    return [products[i] for i in sorted(kept, key=lambda i: products[i].id)]
+
+
+class _TypeFrontier:
+    """
+    Buckets of rule-passing products of one component type, and their frontiers once computed.
+    """
+
+    def __init__(self, component_type: str, purpose: str, products: list[Product]):
+        self.component_type = component_type
+        self.rules = get_rules_for_purpose(purpose)
+        self.selector = ComponentSelector(budget=0, rules=self.rules, session=None, component_type=component_type)
+
+        self.members: dict[tuple, list[Product]] = defaultdict(list)
+        self.candidates: list[Product] | None = None
+        for rule in self.rules:
+            products = rule.apply(products, self.component_type)
+        for product in products:
+            self.members[self.selector.compatibility_key(product)].append(product)
+
+    def get_candidates(self) -> list[Product]:
+        if self.candidates is None:
+            self.candidates = sorted(
+                (product for members in self.members.values() for product in pareto_frontier(members, self.component_type)),
+                key=lambda product: product.id,
+            )
+        return self.candidates
+
+
+class FrontierStore:
+    """
+    Pareto frontiers of a catalog snapshot per (component type, purpose), built on first use.
+    """
+
+    def __init__(self, catalog: dict[str, list[Product]]):
+        """
+        :param catalog: Priced products per component type, see `catalog.load_catalog`.
+        """
+        self.catalog = catalog
+        self._frontiers: dict[tuple[str, str], _TypeFrontier] = {}
+        self._lock = threading.Lock()
+
+    def _frontier(self, component_type: str, purpose: str) -> _TypeFrontier:
+        key = (component_type, purpose)
+        if key not in self._frontiers:
+            self._frontiers[key] = _TypeFrontier(component_type, purpose, self.catalog.get(component_type, []))
+        return self._frontiers[key]
+
+    def candidates(self, component_type: str, purpose: str) -> list[Product]:
+        """
+        Rule-passing, non-dominated products of the type in id order, compatibility not checked.
+        """
+        with self._lock:
+            return list(self._frontier(component_type, purpose).get_candidates())
+
+    def sizes(self, purpose: str) -> dict[str, tuple[int, int]]:
+        """
+        (catalog size, frontier size) per component type, for diagnostics.
+        """
+        return {
+            component_type: (len(products), len(self.candidates(component_type, purpose)))
+            for component_type, products in self.catalog.items()
+        }
@@ -0,0 +1,262 @@
+"""
+Budget-constrained global build optimizer.
+
+Picks one part per component type so that the total weighted quality score is
+maximal while the total price stays within budget and all parts are compatible.
+Solved with depth-first branch-and-bound: candidates of each type are tried best
+score first, and a branch is pruned as soon as its optimistic bound (per-type best
+score, capped by best score-per-dollar times the money left) can't beat the incumbent.
+
+`top_k` enumerates the k best builds with a lazy best-first search over the same
+candidate lists and bounds, so alternatives cost little more than the best build.
+
+With a deadline the search stops when it passes, keeping the best build found so far.
+"""
+
+from collections import defaultdict
+from itertools import count
+from typing import Optional
+import heapq
+import time
+
+from app.models import Product
+from app.services.pc_builder.selector import ComponentSelector
+from app.services.pc_builder.scoring import extract_columns, quality_scores
+
+
+class _DeadlineReached(Exception):
+    pass
+
+
+class BuildOptimizer:
+    """
+    Branch-and-bound search over per-type candidate lists.
+    """
+
+    # Parts that others depend on come first so compatibility prunes early.
+    search_order = ["cpu", "motherboard", "ram", "gpu", "case", "cpu_cooler", "storage", "psu"]
+
+    def __init__(
+        self,
+        budget: float,
+        selector: ComponentSelector,
+        candidates: dict[str, list[Product]],
+        weights: dict[str, float],
+        deadline: Optional[float] = None,
+    ):
+        """
+        :param budget: Maximum total price of the build.
+        :param selector: Selector used for scoring and compatibility checks.
+        :param candidates: Rule-filtered candidates per component type.
+        :param weights: Weight of each component type's score in the total.
+        :param deadline: Optional `time.monotonic()` value at which `solve` stops searching.
+        """
+        self.budget = budget
+        self.deadline = deadline
+        self.timed_out = False
+        self.selector = selector
+        self.weights = weights
+
+        # (score, price, product) per type, best score first and cheapest first among equals
+        self.items: list[list[tuple[float, float, Product]]] = []
+        for component_type in self.search_order:
+            selector.component_type = component_type
+            products = [product for product in candidates.get(component_type, []) if product.price is not None]
+            scores = quality_scores(extract_columns(products, component_type), component_type) * weights.get(component_type, 1.0)
+            scored = [(float(score), product.price, product) for score, product in zip(scores, products)]
+            scored = self._drop_dominated(scored)
+            scored.sort(key=lambda item: (-item[0], item[1]))
+            self.items.append(scored)
+
+        self._prepare_bounds()
+        self.best_score = float("-inf")
+        self.best: Optional[dict[str, Product]] = None
+
+    def _drop_dominated(self, scored: list[tuple[float, float, Product]]) -> list[tuple[float, float, Product]]:
+        """
+        Among products compatible with exactly the same parts, keep only those that
+        no cheaper (or equally priced) product beats on score.
+        """
+        groups: dict[tuple, list[tuple[float, float, Product]]] = defaultdict(list)
+        for item in scored:
+            groups[self.selector.compatibility_key(item[2])].append(item)
+
+        kept = []
+        for group in groups.values():
+            group.sort(key=lambda item: (item[1], -item[0]))
+            best_score = float("-inf")
+            for item in group:
+                if item[0] > best_score:
+                    kept.append(item)
+                    best_score = item[0]
+        return kept
+
+    def _prepare_bounds(self) -> None:
+        # Cheapest price among each type's candidates from a position on, for the bound of
+        # a heap node standing for its unexpanded siblings, see `_sibling_bound`
+        self.min_price_from: list[list[float]] = []
+        for items in self.items:
+            suffix = [float("inf")] * (len(items) + 1)
+            for i in reversed(range(len(items))):
+                suffix[i] = min(items[i][1], suffix[i + 1])
+            self.min_price_from.append(suffix)
+
+        depth = len(self.search_order)
+        self.min_price_suffix = [0.0] * (depth + 1)
+        self.max_score_suffix = [0.0] * (depth + 1)
+        self.max_ratio_suffix = [0.0] * (depth + 1)
+        for i in reversed(range(depth)):
+            items = self.items[i]
+            if not items:
+                self.min_price_suffix[i] = float("inf")
+                continue
+            self.min_price_suffix[i] = self.min_price_suffix[i + 1] + min(price for _, price, _ in items)
+            self.max_score_suffix[i] = self.max_score_suffix[i + 1] + items[0][0]
+            self.max_ratio_suffix[i] = max(
+                self.max_ratio_suffix[i + 1],
+                max(score / price if price > 0 else float("inf") for score, price, _ in items),
+            )
+
+        # GPU and case only fit in pairs, so price them as the cheapest compatible pair.
+        gpu_depth, case_depth = self.search_order.index("gpu"), self.search_order.index("case")
+        if case_depth == gpu_depth + 1 and self.min_price_suffix[gpu_depth] != float("inf"):
+            self.selector.component_type = "case"
+            pair_min_price = min(
+                (
+                    gpu_price + case_price
+                    for _, gpu_price, gpu in self.items[gpu_depth]
+                    for _, case_price, case in self.items[case_depth]
+                    if self.selector.is_compatible_with(case, {"gpu": gpu})
+                ),
+                default=float("inf"),
+            )
+            gpu_case_min_price = pair_min_price + self.min_price_suffix[case_depth + 1]
+            for i in range(gpu_depth + 1):
+                self.min_price_suffix[i] += gpu_case_min_price - self.min_price_suffix[gpu_depth]
+
+    def _upper_bound(self, depth: int, money_left: float) -> float:
+        """
+        Best score the types from ``depth`` on could add with ``money_left``.
+        """
+        return min(self.max_score_suffix[depth], money_left * self.max_ratio_suffix[depth])
+
+    def solve(self, incumbent: Optional[tuple[float, dict[str, Product]]] = None) -> Optional[dict[str, Product]]:
+        """
+        :param incumbent: (total score, build) known to fit, only strictly better builds replace it.
+        :return: Optimal build or None if no compatible build fits the budget.
+            When the deadline passes, the best build found so far and `timed_out` is set.
+        """
+        if incumbent is not None:
+            self.best_score, self.best = incumbent
+        if self.min_price_suffix[0] > self.budget:
+            return self.best
+        try:
+            self._search(0, 0.0, 0.0, {})
+        except _DeadlineReached:
+            self.timed_out = True
+        return self.best
+
+    def _search(self, depth: int, spent: float, score: float, chosen: dict[str, Product]) -> None:
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise _DeadlineReached
+        if depth == len(self.search_order):
+            if score > self.best_score:
+                self.best_score = score
+                self.best = dict(chosen)
+            return
+
+        component_type = self.search_order[depth]
+        money_left = self.budget - spent
+        rest_min_price = self.min_price_suffix[depth + 1]
+
+        for item_score, price, product in self.items[depth]:
+            # Candidates are sorted by score, nothing further down can do better.
+            # Ties are not explored: the first build found with a score wins,
+            # and cheaper parts come first among equal scores.
+            if score + item_score + self.max_score_suffix[depth + 1] <= self.best_score:
+                break
+            if price + rest_min_price > money_left:
+                continue
+            if score + item_score + self._upper_bound(depth + 1, money_left - price) <= self.best_score:
+                continue
+
+            self.selector.component_type = component_type
+            if not self.selector.is_compatible_with(product, chosen):
+                continue
+
+            chosen[component_type] = product
+            self._search(depth + 1, spent + price, score + item_score, chosen)
+            del chosen[component_type]
+
+    def _sibling_bound(self, depth: int, index: int, score_before: float, money_before: float) -> float:
+        """
+        Upper bound for a build that takes the candidate at ``index`` of ``depth`` or any lower-scored one after it.
+        The money left for later types is what the cheapest of those candidates leaves. `min_price_suffix`
+        can't stand in for it, it prices the GPU as part of the cheapest GPU/case pair.
+        """
+        money_after = money_before - self.min_price_from[depth][index]
+        return score_before + self.items[depth][index][0] + self._upper_bound(depth + 1, money_after)
+
+    def _next_feasible(self, depth: int, start: int, money_before: float, chosen: dict[str, Product]) -> int:
+        """
+        Index of the first candidate at ``depth`` from ``start`` on that fits the budget and the chosen parts.
+        """
+        component_type = self.search_order[depth]
+        rest_min_price = self.min_price_suffix[depth + 1]
+        self.selector.component_type = component_type
+        items = self.items[depth]
+        for i in range(start, len(items)):
+            _, price, product = items[i]
+            if price + rest_min_price > money_before:
+                continue
+            if self.selector.is_compatible_with(product, chosen):
+                return i
+        return -1
+
+    def top_k(self, k: int) -> list[tuple[float, dict[str, Product]]]:
+        """
+        Enumerate the k highest-scoring builds, best first.
+        A heap node is a prefix of choices whose last choice also stands for its
+        not yet expanded lower-scored siblings; its key is an upper bound for all of them.
+        Complete builds are re-queued with their exact score, so they leave the heap in order.
+        :return: (total score, build) pairs.
+        """
+        results: list[tuple[float, dict[str, Product]]] = []
+        if k <= 0 or self.min_price_suffix[0] > self.budget:
+            return results
+
+        depth_count = len(self.search_order)
+        tie_breaker = count()
+        heap: list = []
+
+        def push_choice(choices: tuple, depth: int, index: int, score_before: float, spent_before: float) -> None:
+            chosen = self._chosen(choices)
+            index = self._next_feasible(depth, index, self.budget - spent_before, chosen)
+            if index < 0:
+                return
+            bound = self._sibling_bound(depth, index, score_before, self.budget - spent_before)
+            heapq.heappush(heap, (-bound, next(tie_breaker), False, choices + (index,), score_before, spent_before))
+
+        push_choice((), 0, 0, 0.0, 0.0)
+        while heap and len(results) < k:
+            neg_key, _, is_final, choices, score_before, spent_before = heapq.heappop(heap)
+            if is_final:
+                results.append((-neg_key, self._chosen(choices)))
+                continue
+
+            depth = len(choices) - 1
+            item_score, price, _ = self.items[depth][choices[-1]]
+            push_choice(choices[:-1], depth, choices[-1] + 1, score_before, spent_before)
+
+            score, spent = score_before + item_score, spent_before + price
+            if depth + 1 == depth_count:
+                heapq.heappush(heap, (-score, next(tie_breaker), True, choices, score, spent))
+            else:
+                push_choice(choices, depth + 1, 0, score, spent)
+        return results
+
+    def _chosen(self, choices: tuple) -> dict[str, Product]:
+        return {
+            self.search_order[depth]: self.items[depth][index][2]
+            for depth, index in enumerate(choices)
+        }
@@ -1,5 +1,14 @@
-from typing import List
-from app.models import Product
+import json
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import ColumnElement
+
+from app.core.config import get_settings
+from app.models import Product, RAMAttributes
+from app.services.pc_builder.scoring import ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE
 
 
 class RuleBase:
@@ -9,6 +18,19 @@ class RuleBase:
     def apply(self, products: List[Product], component_type: str) -> List[Product]:
         raise NotImplementedError
 
+    def sql_predicates(self, component_type: str) -> Optional[List[ColumnElement[bool]]]:
+        """
+        SQL form of the rule, composed into the candidate query's WHERE clause.
+        :return: None if the rule can only be applied in Python, empty list if it doesn't filter this component type.
+        """
+        return None
+
+    def explain(self, component_type: str) -> List[Tuple[str, "RuleBase"]]:
+        """
+        Named steps the rule is made of, applied one by one when tracing a build.
+        """
+        return [(type(self).__name__, self)]
+
 
 class MinRamSizeRule(RuleBase):
     def __init__(self, min_total_gb: int):
@@ -22,15 +44,211 @@ class MinRamSizeRule(RuleBase):
             if p.ram_attributes.total_memory >= self.min_total_gb
         ]
 
+    def sql_predicates(self, component_type: str) -> Optional[List[ColumnElement[bool]]]:
+        if component_type != "ram":
+            return []
+        return [RAMAttributes.total_memory >= self.min_total_gb]
+
+
+OPERATORS: dict[str, Callable[[Any, Any], Any]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "in": lambda actual, value: actual in value,
+    "not_in": lambda actual, value: actual not in value,
+}
+ORDERING_OPERATORS = {">", ">=", "<", "<="}
+# Fields read from the product row itself, everything else comes from the attrs row.
+PRODUCT_FIELDS = {"price", "rating"}
+
+
+class RuleSpec:
+    """
+    A rule declared as data: `<component_type> products must have <field> <op> <value>`.
+    Products whose field is missing fail the rule, like NULLs do in SQL.
+    """
+
+    def __init__(self, component_type: str, field: str, op: str, value: Any):
+        """
+        :param component_type: Component type the rule filters, other types pass untouched
+        :param field: Column of the component type's attrs model, or "price"/"rating" of the product
+        :param op: One of `OPERATORS`
+        :param value: Value to compare with, a list for "in"/"not_in"
+        """
+        if component_type not in ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE:
+            raise ValueError(f"Unknown component type in rule: {component_type}")
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown rule operator: {op}")
+
+        self.component_type = component_type
+        self.field = field
+        self.op = op
+        self.on_product = field in PRODUCT_FIELDS
+
+        model = Product if self.on_product else self.attrs_model(component_type)
+        if field not in model.__table__.columns:
+            raise ValueError(f"{model.__name__} has no column {field}")
+        self.column = getattr(model, field)
+        self.numeric = model.__table__.columns[field].type.python_type in (int, float)
+
+        if op in ("in", "not_in"):
+            value = frozenset(value)
+        elif op in ORDERING_OPERATORS and not self.numeric:
+            raise ValueError(f"Operator {op} needs a numeric field, {field} is not")
+        self.value = value
+
+    @staticmethod
+    def attrs_model(component_type: str) -> type:
+        relationship = getattr(Product, ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE[component_type])
+        return relationship.property.mapper.class_
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RuleSpec":
+        return cls(data["component_type"], data["field"], data["op"], data["value"])
+
+    def sql_predicate(self) -> ColumnElement[bool]:
+        if self.op == "in":
+            return self.column.in_(sorted(self.value))
+        if self.op == "not_in":
+            return self.column.not_in(sorted(self.value))
+        return OPERATORS[self.op](self.column, self.value)
+
+    def mask(self, values: np.ndarray) -> np.ndarray:
+        """
+        Vectorized form of the rule over a column from `CompiledRules.extract_columns`.
+        """
+        if values.dtype.kind == "f":
+            present = ~np.isnan(values)
+        else:
+            present = values != None  # noqa: E711, elementwise on object arrays
+        if self.op in ("in", "not_in"):
+            matches = np.isin(values, list(self.value))
+            return present & (matches if self.op == "in" else ~matches)
+        return present & OPERATORS[self.op](values, self.value)
+
+    def label(self) -> str:
+        value = sorted(self.value) if isinstance(self.value, frozenset) else self.value
+        return f"{self.field} {self.op} {value}"
+
+    def __repr__(self) -> str:
+        return f"RuleSpec({self.component_type!r}, {self.field!r}, {self.op!r}, {self.value!r})"
+
+
+class CompiledRules(RuleBase):
+    """
+    A set of rule specs compiled once into a single fused predicate per component type,
+    so candidates are filtered in one pass instead of one list per rule.
+    """
+
+    def __init__(self, specs: Iterable[RuleSpec]):
+        self.specs = list(specs)
+        self._specs_by_type: dict[str, list[RuleSpec]] = {}
+        for spec in self.specs:
+            self._specs_by_type.setdefault(spec.component_type, []).append(spec)
+        self._predicates = {
+            component_type: self._fuse(component_type, specs)
+            for component_type, specs in self._specs_by_type.items()
+        }
+
+    @staticmethod
+    def _fuse(component_type: str, specs: list[RuleSpec]) -> Callable[[Product], bool]:
+        relationship = ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE[component_type]
+        checks = tuple((spec.on_product, spec.field, OPERATORS[spec.op], spec.value) for spec in specs)
+
+        def predicate(product: Product) -> bool:
+            attrs = getattr(product, relationship)
+            if attrs is None:
+                return False
+            for on_product, field, op, value in checks:
+                actual = getattr(product if on_product else attrs, field)
+                if actual is None or not op(actual, value):
+                    return False
+            return True
+
+        return predicate
+
+    def predicate(self, component_type: str) -> Optional[Callable[[Product], bool]]:
+        """
+        :return: Fused predicate of the component type's rules, None if no rule filters it.
+        """
+        return self._predicates.get(component_type)
+
+    def apply(self, products: List[Product], component_type: str) -> List[Product]:
+        predicate = self._predicates.get(component_type)
+        if predicate is None:
+            return products
+        return [product for product in products if predicate(product)]
+
+    def sql_predicates(self, component_type: str) -> Optional[List[ColumnElement[bool]]]:
+        return [spec.sql_predicate() for spec in self._specs_by_type.get(component_type, [])]
+
+    def explain(self, component_type: str) -> List[Tuple[str, RuleBase]]:
+        return [(spec.label(), CompiledRules([spec])) for spec in self._specs_by_type.get(component_type, [])]
+
+    def extract_columns(self, products: List[Product], component_type: str) -> dict[str, np.ndarray]:
+        """
+        Load the fields the component type's rules look at into arrays:
+        float64 with NaN for missing numbers, object arrays for the rest.
+        """
+        relationship = ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE[component_type]
+        columns = {}
+        for spec in self._specs_by_type.get(component_type, []):
+            if spec.field in columns:
+                continue
+            values = (
+                getattr(product if spec.on_product else getattr(product, relationship), spec.field)
+                for product in products
+            )
+            if spec.numeric:
+                columns[spec.field] = np.fromiter(
+                    (np.nan if value is None else value for value in values), dtype=np.float64, count=len(products)
+                )
+            else:
+                columns[spec.field] = np.fromiter(values, dtype=object, count=len(products))
+        return columns
+
+    def mask(self, columns: dict[str, np.ndarray], component_type: str, count: int) -> np.ndarray:
+        """
+        Boolean mask of the candidates passing every rule of the component type.
+        :param columns: Columns from `extract_columns`
+        :param count: Number of candidates, for component types no rule filters
+        """
+        result = np.ones(count, dtype=bool)
+        for spec in self._specs_by_type.get(component_type, []):
+            result &= spec.mask(columns[spec.field])
+        return result
+
+
+# Rule sets per purpose, in the format of the PC_BUILDER_RULES_PATH JSON file.
+DEFAULT_RULE_SPECS: dict[str, list[dict]] = {
+    "gaming": [{"component_type": "ram", "field": "total_memory", "op": ">=", "value": 16}],
+    "office": [{"component_type": "ram", "field": "total_memory", "op": ">=", "value": 8}],
+    "development": [{"component_type": "ram", "field": "total_memory", "op": ">=", "value": 32}],
+}
+
+
+def load_rule_specs(path: Optional[str]) -> dict[str, list[dict]]:
+    """
+    :param path: JSON file mapping purpose to a list of rule specs, the defaults when None.
+    """
+    if path is None:
+        return DEFAULT_RULE_SPECS
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+@lru_cache
+def compile_rules_for_purpose(purpose: str, path: Optional[str] = None) -> CompiledRules:
+    return CompiledRules(RuleSpec.from_dict(spec) for spec in load_rule_specs(path).get(purpose, []))
+
 
 def get_rules_for_purpose(purpose: str) -> list[RuleBase]:
     """
     Return a list of rules depending on the PC purpose.
+    Rule sets come from PC_BUILDER_RULES_PATH when set and are compiled once per purpose.
     """
-    if purpose == "gaming":
-        return [MinRamSizeRule(16)]
-    elif purpose == "office":
-        return [MinRamSizeRule(8)]
-    elif purpose == "development":
-        return [MinRamSizeRule(32)]
-    return []
+    rules = compile_rules_for_purpose(purpose, get_settings().pc_builder_rules_path)
+    return [rules] if rules.specs else []
@@ -0,0 +1,94 @@
+"""
+Builds for the HTTP API: run off the event loop, bounded in number and in time.
+
+At most PC_BUILDER_MAX_CONCURRENT_BUILDS builds run at once, each on a worker thread
+with its own session, so a traffic spike queues requests instead of draining the DB
+pool. A build that doesn't finish within PC_BUILDER_DEADLINE_SECONDS (queueing
+included) returns the best build found so far, flagged as partial.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.models import Product
+from app.schemas.build import BuildSpec
+from app.services.pc_builder.builder import BuildDeadlineExceeded, PCBuilder
+from app.services.pc_builder.cache import cached_build
+from app.services.pc_builder.catalog import get_compatibility_index
+
+settings = get_settings()
+
+_build_executor = ThreadPoolExecutor(
+    max_workers=settings.pc_builder_max_concurrent_builds,
+    thread_name_prefix="pc-build-request",
+)
+_build_slots = asyncio.Semaphore(settings.pc_builder_max_concurrent_builds)
+
+
+class BuildsBusy(Exception):
+    """
+    No build slot freed up before the request's deadline.
+    """
+
+
+def run_build(spec: BuildSpec, deadline: float) -> tuple[Optional[dict[str, Product]], bool, Optional[dict]]:
+    """
+    Build the spec in a session of its own, stopping at the deadline.
+    Untraced specs go through the build cache, traced ones always run, see `batch.traced_build`.
+    :param deadline: `time.monotonic()` value after which the best build so far is returned
+    :return: (build, partial, trace). build is None when the deadline passed before any part was picked.
+    """
+    with SessionLocal() as session:
+        if not spec.trace:
+            try:
+                return cached_build(
+                    budget=spec.budget,
+                    purpose=spec.purpose,
+                    session=session,
+                    admin_overrides=spec.overrides,
+                    optimize=spec.optimize,
+                    deadline=deadline,
+                ), False, None
+            except BuildDeadlineExceeded as e:
+                return e.components or None, True, None
+
+        try:
+            catalog_index = get_compatibility_index(session, deadline=deadline)
+        except TimeoutError:
+            # The first index load is still running, select from the database
+            catalog_index = None
+        builder = PCBuilder(
+            budget=spec.budget,
+            purpose=spec.purpose,
+            session=session,
+            admin_overrides=spec.overrides,
+            catalog_index=catalog_index,
+            deadline=deadline,
+        )
+        try:
+            return builder.build(optimize=spec.optimize, trace=True), False, builder.trace.to_dict()
+        except BuildDeadlineExceeded as e:
+            return e.components or None, True, builder.trace.to_dict()
+
+
+async def run_build_async(spec: BuildSpec) -> tuple[Optional[dict[str, Product]], bool, Optional[dict]]:
+    """
+    `run_build` on the build pool, once a slot is free.
+    :raise BuildsBusy: No slot freed up within the deadline.
+    """
+    deadline = time.monotonic() + settings.pc_builder_deadline_seconds
+    if _build_slots.locked():
+        try:
+            await asyncio.wait_for(_build_slots.acquire(), timeout=settings.pc_builder_deadline_seconds)
+        except asyncio.TimeoutError:
+            raise BuildsBusy("Too many builds in progress, try again later")
+    else:
+        await _build_slots.acquire()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_build_executor, run_build, spec, deadline)
+    finally:
+        _build_slots.release()
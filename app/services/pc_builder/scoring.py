@@ -0,0 +1,93 @@
+"""
+Vectorized scoring of component candidates.
+
+Numeric attributes of all candidates of one component type are loaded into
+contiguous NumPy arrays and scored with a single weighted sum. Features and
+weights mirror `ComponentSelector.quality_score`, and the operations run in the
+same order so both paths produce bit-identical scores.
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+from app.models import ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE, Product
+
+# (attribute, weight) per component type, in the order the scalar scorer adds them up.
+SCORE_FEATURES: dict[str, list[tuple[str, float]]] = {
+    "ram": [("total_memory", 2), ("ram_speed", 0.1)],
+    "cpu": [("cores", 1.5), ("threads", 1.0), ("turbo_speed", 2)],
+    "gpu": [("memory", 4), ("clock_speed", 0.1)],
+    "storage": [("capacity", 0.02), ("is_ssd", 5)],
+    "psu": [("power", 0.05)],
+}
+
+
+def _feature_value(attrs, feature: str) -> float:
+    if feature == "is_ssd":
+        return 1.0 if attrs.mem_type == "SSD" else 0.0
+    value = getattr(attrs, feature)
+    # The scalar scorer treats missing values as 0
+    return float(value) if value else 0.0
+
+
+def extract_columns(products: Sequence[Product], component_type: str) -> dict[str, np.ndarray]:
+    """
+    Load price and scored attributes of the products into float64 arrays.
+    """
+    relationship = ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE[component_type]
+    count = len(products)
+    columns = {
+        "price": np.fromiter((product.price or 1 for product in products), dtype=np.float64, count=count),
+    }
+    for feature, _ in SCORE_FEATURES.get(component_type, []):
+        columns[feature] = np.fromiter(
+            (_feature_value(getattr(product, relationship), feature) for product in products),
+            dtype=np.float64,
+            count=count,
+        )
+    return columns
+
+
+def feature_weights(component_type: str, scale: float = 1.0) -> np.ndarray:
+    """
+    Weight vector of the component type's features, optionally scaled by a purpose weight.
+    """
+    return np.array([weight for _, weight in SCORE_FEATURES.get(component_type, [])], dtype=np.float64) * scale
+
+
+def quality_scores(columns: dict[str, np.ndarray], component_type: str, weights: np.ndarray | None = None) -> np.ndarray:
+    """
+    Vectorized `ComponentSelector.quality_score`.
+    """
+    weights = feature_weights(component_type) if weights is None else weights
+    scores = np.zeros(len(columns["price"]), dtype=np.float64)
+    for (feature, _), weight in zip(SCORE_FEATURES.get(component_type, []), weights):
+        scores += columns[feature] * weight
+    return scores
+
+
+def price_weighted_scores(columns: dict[str, np.ndarray], component_type: str, weights: np.ndarray | None = None) -> np.ndarray:
+    """
+    Vectorized `ComponentSelector._score`.
+    """
+    return quality_scores(columns, component_type, weights) * (1.0 / columns["price"])
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first. Ties keep input order,
+    like a stable descending sort would.
+    """
+    if k <= 0 or not len(scores):
+        return np.empty(0, dtype=np.intp)
+    if k == 1:
+        return np.array([np.argmax(scores)], dtype=np.intp)
+    if k < len(scores):
+        kth = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        # Take every element tied with the k-th best, so the stable tie-break below stays exact.
+        indices = np.flatnonzero(scores >= kth)
+    else:
+        indices = np.arange(len(scores))
+    order = np.lexsort((indices, -scores[indices]))
+    return indices[order][:k]
@@ -3,24 +3,30 @@ Upgraded PC component selection engine with compatibility logic,
 scoring system, and rules enforcement.
 """
 
-from typing import Optional, List
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Optional, List
+from sqlalchemy import ColumnElement, select, case, literal, or_
+from sqlalchemy.orm import Session, contains_eager, joinedload, noload
 from app.models import Product
 from app.services.pc_builder.rules import RuleBase
 from app.services.pc_builder.enums import COMPONENTS_ENUM
+from app.services.pc_builder.scoring import extract_columns, price_weighted_scores, top_k
+from app.services.pc_builder.trace import BuildTrace
 from app.models import (
+    ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE,
     BaseAttrsModel,
     CPUAttributes,
-    CPUCoolerAttributes,
-    GPUAttributes,
     MotherboardAttributes,
     RAMAttributes,
-    StorageAttributes,
     PowerSupplyAttributes,
     CaseAttributes,
+    attrs_model,
 )
 
+if TYPE_CHECKING:
+    from app.services.pc_builder.compatibility import CompatibilityIndex
+    from app.services.pc_builder.shared_catalog import CatalogGeneration
+
 
 class ComponentSelector:
     """
@@ -29,16 +35,24 @@ class ComponentSelector:
     """
 
     component_types_to_attr_model_mapping: dict[str, type[BaseAttrsModel]] = {
-        "cpu": CPUAttributes,
-        "cpu_cooler": CPUCoolerAttributes,
-        "gpu": GPUAttributes,
-        "motherboard": MotherboardAttributes,
-        "ram": RAMAttributes,
-        "storage": StorageAttributes,
-        "psu": PowerSupplyAttributes,
-        "case": CaseAttributes,
+        component_type: attrs_model(component_type) for component_type in ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE
+    }
+
+    component_types_to_attr_relationship_mapping = {
+        component_type: getattr(Product, relationship)
+        for component_type, relationship in ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE.items()
     }
 
+    case_gpu_length_limits: dict[str, int] = {
+        "Mini ITX": 260,
+        "MicroATX Mini Tower": 280,
+        "MicroATX Mid Tower": 300,
+        "ATX Mini Tower": 300,
+        "ATX Mid Tower": 340,
+        "ATX Full Tower": 400,
+    }
+    default_case_gpu_length_limit = 250
+
     def __init__(
         self,
         budget: float,
@@ -46,6 +60,10 @@ class ComponentSelector:
         session: Session,
         component_type: Optional[str] = None,
         selected_components: Optional[dict[str, Product]] = None,
+        catalog_index: Optional["CompatibilityIndex"] = None,
+        frontier: Optional[Callable[[str], List[Product]]] = None,
+        trace: Optional[BuildTrace] = None,
+        shared_catalog: Optional["CatalogGeneration"] = None,
     ):
         """
         :param budget: Total PC budget.
@@ -53,12 +71,22 @@ class ComponentSelector:
         :param session: SQLAlchemy session.
         :param component_type: Target component type to select.
         :param selected_components: Already selected components for compatibility reference.
+        :param catalog_index: Optional in-memory catalog to take candidates from instead of querying the DB.
+        :param frontier: Optional source of non-dominated candidates per component type,
+            see `frontier.FrontierStore.candidates`. Takes precedence over the catalog index.
+        :param trace: Optional trace to record the candidate funnel in, see `trace.BuildTrace`.
+        :param shared_catalog: Optional memory-mapped catalog to select from, only the picked
+            products are loaded from the DB. Used for `select_top_k` when it supports the rules.
         """
         self.budget = budget
         self.rules = rules
         self.session = session
         self.component_type = component_type
         self.selected_components = selected_components or {}
+        self.catalog_index = catalog_index
+        self.frontier = frontier
+        self.trace = trace
+        self.shared_catalog = shared_catalog
 
     @property
     def component_type(self) -> str:
@@ -76,31 +104,217 @@ class ComponentSelector:
         Orchestrates product selection.
         :return: Optimal product or None if not found.
         """
+        best = self.select_top_k(1)
+        return best[0] if best else None
+
+    def select_top_k(self, k: int) -> List[Product]:
+        """
+        :return: Up to k best products, best first.
+        """
         if not self.component_type:
             raise ValueError("Component type is not set")
+        if self.trace is not None:
+            return self._select_top_k_traced(k)
+        if self.shared_catalog is not None and self.shared_catalog.supports(self.rules):
+            return self._select_top_k_shared(k)
 
         candidates = self._fetch_all_products()
         candidates = self._apply_rules(candidates)
         candidates = self._filter_by_compatibility(candidates)
+        if not candidates:
+            return []
+
+        columns = extract_columns(candidates, self.component_type)
+        scores = price_weighted_scores(columns, self.component_type)
+        return [candidates[i] for i in top_k(scores, k)]
+
+    def _select_top_k_shared(self, k: int) -> List[Product]:
+        ids = self.shared_catalog.top_k_ids(
+            self.component_type,
+            self.rules,
+            self.selected_components,
+            self._estimate_power_draw(),
+            k,
+        )
+        if not ids:
+            return []
+        attrs_relationship = self.component_types_to_attr_relationship_mapping[self.component_type]
+        stmt = (
+            select(Product)
+            .join(attrs_relationship)
+            # Same loading as `catalog.load_catalog`, so picked products can be cached and used detached
+            .options(contains_eager(attrs_relationship), joinedload(Product.category), noload("*"))
+            .where(Product.id.in_(ids))
+        )
+        products = {product.id: product for product in self.session.execute(stmt).scalars()}
+        # Products deleted since the catalog generation was written are skipped
+        return [products[product_id] for product_id in ids if product_id in products]
+
+    def _select_top_k_traced(self, k: int) -> List[Product]:
+        component_trace = self.trace.component(self.component_type)
+        candidates = self._traced_candidates()
+
+        candidates = self._filter_by_compatibility(candidates)
+        component_trace.compatible = len(candidates)
+        if not candidates:
+            return []
+
+        started = perf_counter()
+        columns = extract_columns(candidates, self.component_type)
+        scores = price_weighted_scores(columns, self.component_type)
+        best = top_k(scores, max(k, 1 + self.trace.runners_up))
+        component_trace.scoring_ms = (perf_counter() - started) * 1000
 
-        scored = [(product, self._score(product)) for product in candidates]
-        scored.sort(key=lambda tup: tup[1], reverse=True)
+        component_trace.selected = component_trace.describe(candidates[best[0]], scores[best[0]])
+        component_trace.runners_up = [component_trace.describe(candidates[i], scores[i]) for i in best[1:1 + self.trace.runners_up]]
+        return [candidates[i] for i in best[:k]]
 
-        return scored[0][0] if scored else None
+    def _traced_candidates(self) -> List[Product]:
+        """
+        Fetch candidates and apply the rules step by step, recording the funnel in the trace.
+        """
+        component_trace = self.trace.component(self.component_type)
+        started = perf_counter()
+        candidates = self._fetch_all_products()
+        component_trace.fetch_ms = (perf_counter() - started) * 1000
+        component_trace.fetched = len(candidates)
+        if self.frontier is not None:
+            component_trace.source = "frontier"
+        else:
+            component_trace.source = "index" if self.catalog_index is not None else "sql"
+
+        for rule in self.rules:
+            for label, step in rule.explain(self.component_type):
+                candidates = step.apply(candidates, self.component_type)
+                component_trace.rules.append({"rule": label, "remaining": len(candidates)})
+        return candidates
+
+    def get_candidates(self) -> List[Product]:
+        """
+        Products of the current component type that pass the rules,
+        without any compatibility filtering.
+        """
+        selected_components, self.selected_components = self.selected_components, {}
+        try:
+            if self.trace is not None:
+                return self._traced_candidates()
+            return self._apply_rules(self._fetch_all_products())
+        finally:
+            self.selected_components = selected_components
+
+    def is_compatible_with(self, product: Product, selected_components: dict[str, Product]) -> bool:
+        """
+        Check a product of the current component type against a given set of parts.
+        """
+        self.selected_components = selected_components
+        return self._is_compatible(product)
 
     def _fetch_all_products(self) -> List[Product]:
-        AttrsModel = self.component_types_to_attr_model_mapping[self.component_type]
-        result = self.session.execute(select(Product).join(AttrsModel))
+        """
+        Load priced candidates together with their attrs row in a single query,
+        so rules, compatibility checks and scoring never trigger lazy loads.
+        Rules and compatibility constraints with a SQL form are applied in the WHERE clause, unless tracing.
+        With a catalog index, compatible candidates come from its lookups instead.
+        With a frontier, only its few non-dominated candidates are returned and checked for compatibility later.
+        """
+        if self.frontier is not None:
+            return self.frontier(self.component_type)
+        if self.catalog_index is not None:
+            if self.trace is not None:
+                # Compatibility is filtered later, so the trace can count it
+                return list(self.catalog_index.catalog.get(self.component_type, []))
+            return self.catalog_index.compatible(
+                self.component_type,
+                self.selected_components,
+                self._estimate_power_draw(),
+            )
+
+        attrs_relationship = self.component_types_to_attr_relationship_mapping[self.component_type]
+        stmt = (
+            select(Product)
+            .join(attrs_relationship)
+            .options(contains_eager(attrs_relationship))
+            .where(Product.price.isnot(None))
+            .order_by(Product.id)
+        )
+        # Traced builds apply rules and compatibility in Python, so each step can be counted
+        if self.trace is None:
+            stmt = stmt.where(*self._rules_predicates(), *self._compatibility_predicates())
+        result = self.session.execute(stmt)
         return result.scalars().all()
 
+    def _rules_predicates(self) -> List[ColumnElement[bool]]:
+        predicates = []
+        for rule in self.rules:
+            predicates.extend(rule.sql_predicates(self.component_type) or [])
+        return predicates
+
     def _apply_rules(self, products: List[Product]) -> List[Product]:
+        """
+        Apply rules that have no SQL form, the rest were already applied by the candidate query.
+        Candidates from a catalog index or a frontier went through no SQL, so they get every rule.
+        """
+        in_memory = self.catalog_index is not None or self.frontier is not None
         for rule in self.rules:
-            products = rule.apply(products, self.component_type)
+            if in_memory or rule.sql_predicates(self.component_type) is None:
+                products = rule.apply(products, self.component_type)
         return products
 
+    def _compatibility_predicates(self) -> List[ColumnElement[bool]]:
+        """
+        SQL counterpart of `_is_compatible`. NULL attributes are rejected just like
+        the comparisons that raise in Python.
+        """
+        if not self.selected_components:
+            return []
+
+        predicates = []
+        if self.component_type == "motherboard":
+            cpu = self.selected_components.get("cpu")
+            if cpu:
+                predicates.append(MotherboardAttributes.socket_type == cpu.cpu_attributes.socket_type)
+
+        elif self.component_type == "ram":
+            cpu = self.selected_components.get("cpu")
+            mb = self.selected_components.get("motherboard")
+            if cpu:
+                predicates.append(RAMAttributes.ram_type == cpu.cpu_attributes.memory_type)
+                predicates.append(RAMAttributes.ram_speed <= literal(cpu.cpu_attributes.memory_speed))
+            if mb:
+                predicates.append(RAMAttributes.total_memory <= literal(mb.motherboard_attributes.max_ram_support))
+                predicates.append(RAMAttributes.quantity <= literal(mb.motherboard_attributes.ram_slots))
+
+        elif self.component_type == "cpu":
+            mb = self.selected_components.get("motherboard")
+            if mb:
+                predicates.append(CPUAttributes.socket_type == mb.motherboard_attributes.socket_type)
+
+        elif self.component_type == "case":
+            gpu = self.selected_components.get("gpu")
+            if gpu:
+                case_limit = case(
+                    self.case_gpu_length_limits,
+                    value=CaseAttributes.cabinet_type,
+                    else_=self.default_case_gpu_length_limit,
+                )
+                predicates.append(
+                    or_(
+                        CaseAttributes.cabinet_type.is_(None),
+                        CaseAttributes.cabinet_type == "",
+                        literal(gpu.gpu_attributes.length) <= case_limit,
+                    )
+                )
+
+        elif self.component_type == "psu":
+            predicates.append(PowerSupplyAttributes.power >= self._estimate_power_draw())
+
+        return predicates
+
     def _filter_by_compatibility(self, products: List[Product]) -> List[Product]:
         """
         Filter out products that are incompatible with already selected components.
+        Rows coming from `_fetch_all_products` are already narrowed by SQL, this pass stays
+        as the reference check.
         """
         if not self.selected_components:
             return products
@@ -154,19 +368,34 @@ class ComponentSelector:
 
         return True
 
+    def compatibility_key(self, product: Product) -> tuple:
+        """
+        Attributes of the product that `_is_compatible` looks at, in either direction.
+        Two products of the current type with the same key are compatible with exactly the same parts.
+        """
+        if self.component_type == "cpu":
+            attrs = product.cpu_attributes
+            return (attrs.socket_type, attrs.memory_type, attrs.memory_speed)
+        elif self.component_type == "motherboard":
+            attrs = product.motherboard_attributes
+            return (attrs.socket_type, attrs.max_ram_support, attrs.ram_slots)
+        elif self.component_type == "ram":
+            attrs = product.ram_attributes
+            return (attrs.ram_type, attrs.ram_speed, attrs.total_memory, attrs.quantity)
+        elif self.component_type == "gpu":
+            return (product.gpu_attributes.length,)
+        elif self.component_type == "case":
+            cabinet_type = product.case_attributes.cabinet_type
+            return (self._get_case_gpu_length_limit(cabinet_type) if cabinet_type else None,)
+        elif self.component_type == "psu":
+            return (product.power_supply_attributes.power,)
+        return ()
+
     def _get_case_gpu_length_limit(self, cabinet_type: str) -> int:
         """
         Mocked average GPU fit limit by case type.
         """
-        limits = {
-            "Mini ITX": 260,
-            "MicroATX Mini Tower": 280,
-            "MicroATX Mid Tower": 300,
-            "ATX Mini Tower": 300,
-            "ATX Mid Tower": 340,
-            "ATX Full Tower": 400,
-        }
-        return limits.get(cabinet_type, 250)
+        return self.case_gpu_length_limits.get(cabinet_type, self.default_case_gpu_length_limit)
 
     def _estimate_power_draw(self) -> int:
         """
@@ -187,8 +416,14 @@ class ComponentSelector:
         """
         Calculate weighted score for product.
         """
-        score = 0
         price_weight = 1.0 / (product.price or 1)
+        return self.quality_score(product) * price_weight
+
+    def quality_score(self, product: Product) -> float:
+        """
+        Score of the product's specs alone, without the price weight.
+        """
+        score = 0
 
         if self.component_type == "ram":
             score += product.ram_attributes.total_memory * 2
@@ -210,5 +445,4 @@ class ComponentSelector:
         elif self.component_type == "psu":
             score += product.power_supply_attributes.power * 0.05
 
-        score *= price_weight
         return score
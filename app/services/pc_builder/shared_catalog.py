@@ -0,0 +1,329 @@
+"""
+Memory-mapped component catalog shared by all worker processes.
+
+A single refresher (``python -m app.services.pc_builder.shared_catalog``) writes the
+catalog as one ``.npy`` array per component type and column into a new generation
+directory, then atomically points the ``current`` symlink at it. Numeric attributes are
+float64 with NaN for missing values; strings are interned into int32 codes of one
+string table, -1 standing for a missing string.
+
+Workers map the arrays read-only (``np.load(mmap_mode="r")``), so their pages live once
+in the OS page cache whatever the number of workers, and switch to a new generation on
+their next build. Selections run on the arrays and only the picked products are loaded
+from the database. Pruned generations stay readable to workers still mapping them.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models import Product
+from app.services.pc_builder.catalog import catalog_version, load_versioned_catalog
+from app.services.pc_builder.rules import CompiledRules, RuleBase
+from app.services.pc_builder.scoring import (
+    ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE,
+    SCORE_FEATURES,
+    extract_columns,
+    price_weighted_scores,
+    top_k,
+)
+from app.services.pc_builder.selector import ComponentSelector
+
+CURRENT_LINK = "current"
+_MISSING_STRING = -1
+_UNKNOWN_STRING = -2
+_SKIPPED_COLUMNS = {"id", "product_id", "created_at", "updated_at"}
+
+
+def _attrs_columns(component_type: str) -> list[tuple[str, bool]]:
+    """
+    (name, is numeric) of the attrs columns stored for the component type.
+    """
+    model = ComponentSelector.component_types_to_attr_model_mapping[component_type]
+    return [
+        (column.name, column.type.python_type in (int, float))
+        for column in model.__table__.columns
+        if column.name not in _SKIPPED_COLUMNS
+    ]
+
+
+def write_generation(root: Path, catalog: dict[str, list[Product]], version: Optional[int]) -> Path:
+    """
+    Write the catalog as a new generation directory under ``root``, not yet published.
+    :param catalog: Priced products per component type in id order, see `catalog.load_catalog`.
+    :param version: Catalog version the products were loaded at, None if not tracked.
+    """
+    # Never reuses a directory: one left by a crashed refresher or a restored database may
+    # hold another catalog at the same version, and workers may still be mapping it.
+    name = f"gen-{version}-{time.time_ns()}" if version is not None else f"gen-{time.time_ns()}"
+    generation = root / name
+
+    # Written under a temporary name, so a half-written generation is never picked up
+    staging = root / f".{name}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    codes: dict[str, int] = {}
+
+    def encode(value: Optional[str]) -> int:
+        return _MISSING_STRING if value is None else codes.setdefault(value, len(codes))
+
+    counts = {}
+    for component_type, products in catalog.items():
+        attrs = [getattr(product, ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE[component_type]) for product in products]
+        columns = {
+            "id": np.array([product.id for product in products], dtype=np.int64),
+            "price": np.array([np.nan if product.price is None else product.price for product in products], dtype=np.float64),
+            "rating": np.array([np.nan if product.rating is None else product.rating for product in products], dtype=np.float64),
+        }
+        for column, numeric in _attrs_columns(component_type):
+            values = [getattr(row, column) for row in attrs]
+            if numeric:
+                columns[column] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+            else:
+                columns[column] = np.array([encode(value) for value in values], dtype=np.int32)
+        if component_type == "case":
+            # NaN: no cabinet type, fits any GPU
+            columns["gpu_length_limit"] = np.array(
+                [
+                    ComponentSelector.case_gpu_length_limits.get(row.cabinet_type, ComponentSelector.default_case_gpu_length_limit)
+                    if row.cabinet_type else np.nan
+                    for row in attrs
+                ],
+                dtype=np.float64,
+            )
+        # Scoring inputs exactly as `scoring.extract_columns` builds them, so scores match the in-memory paths
+        for feature, values in extract_columns(products, component_type).items():
+            columns[f"score.{feature}"] = values
+
+        for column, values in columns.items():
+            np.save(staging / f"{component_type}.{column}.npy", values)
+        counts[component_type] = len(products)
+
+    strings = sorted(codes, key=codes.get)
+    (staging / "meta.json").write_text(json.dumps({"version": version, "counts": counts, "strings": strings}))
+    os.rename(staging, generation)
+    return generation
+
+
+def publish_generation(root: Path, generation: Path, keep: int = 2) -> None:
+    """
+    Atomically make ``generation`` the current one and prune all but the ``keep`` newest generations.
+    """
+    link = root / f".{CURRENT_LINK}.tmp-{os.getpid()}"
+    link.unlink(missing_ok=True)
+    os.symlink(generation.name, link)
+    os.replace(link, root / CURRENT_LINK)
+
+    generations = sorted(
+        (path for path in root.glob("gen-*") if path.name != generation.name),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    for path in generations[keep - 1:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class CatalogGeneration:
+    """
+    Read-only view of one published generation. Every column is mapped when the generation
+    is opened, so it stays readable after the refresher prunes its directory.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        meta = json.loads((path / "meta.json").read_text())
+        self.version: Optional[int] = meta["version"]
+        self.counts: dict[str, int] = meta["counts"]
+        self.codes = {value: code for code, value in enumerate(meta["strings"])}
+        # The extra last slot makes the missing-string code -1 decode to None
+        self.strings = np.array(meta["strings"] + [None], dtype=object)
+        self._columns: dict[str, np.ndarray] = {
+            column.name.removesuffix(".npy"): np.load(column, mmap_mode="r")
+            for column in path.glob("*.npy")
+        }
+
+    def column(self, component_type: str, name: str) -> np.ndarray:
+        return self._columns[f"{component_type}.{name}"]
+
+    def code(self, value: Optional[str]) -> int:
+        return _MISSING_STRING if value is None else self.codes.get(value, _UNKNOWN_STRING)
+
+    def compatible_mask(self, component_type: str, selected_components: dict[str, Product], min_power: int) -> Optional[np.ndarray]:
+        """
+        Rows `ComponentSelector._is_compatible` would accept, None if all of them.
+        NaN compares False, like the TypeError the scalar check turns into a rejection.
+        """
+        if not selected_components:
+            return None
+
+        def column(name: str) -> np.ndarray:
+            return self.column(component_type, name)
+
+        if component_type == "motherboard" and (cpu := selected_components.get("cpu")):
+            return column("socket_type") == self.code(cpu.cpu_attributes.socket_type)
+
+        if component_type == "cpu" and (mb := selected_components.get("motherboard")):
+            return column("socket_type") == self.code(mb.motherboard_attributes.socket_type)
+
+        if component_type == "ram":
+            mask = np.ones(self.counts.get("ram", 0), dtype=bool)
+            if cpu := selected_components.get("cpu"):
+                memory_speed = cpu.cpu_attributes.memory_speed
+                if memory_speed is None:
+                    return np.zeros_like(mask)
+                mask &= (column("ram_type") == self.code(cpu.cpu_attributes.memory_type)) & (column("ram_speed") <= memory_speed)
+            if mb := selected_components.get("motherboard"):
+                mb_attrs = mb.motherboard_attributes
+                if mb_attrs.max_ram_support is None or mb_attrs.ram_slots is None:
+                    return np.zeros_like(mask)
+                mask &= (column("total_memory") <= mb_attrs.max_ram_support) & (column("quantity") <= mb_attrs.ram_slots)
+            return mask
+
+        if component_type == "case" and (gpu := selected_components.get("gpu")):
+            limit = column("gpu_length_limit")
+            if gpu.gpu_attributes.length is None:
+                return np.isnan(limit)
+            return np.isnan(limit) | (limit >= gpu.gpu_attributes.length)
+
+        if component_type == "psu":
+            return column("power") >= min_power
+
+        return None
+
+    def _rule_columns(self, component_type: str, rule: CompiledRules) -> dict[str, np.ndarray]:
+        columns = {}
+        for spec in rule.specs:
+            if spec.component_type == component_type and spec.field not in columns:
+                values = self.column(component_type, spec.field)
+                # Numbers are used in place, strings are decoded for the rule's comparisons
+                columns[spec.field] = values if spec.numeric else self.strings[values]
+        return columns
+
+    def top_k_ids(
+        self,
+        component_type: str,
+        rules: list[RuleBase],
+        selected_components: dict[str, Product],
+        min_power: int,
+        k: int,
+    ) -> list[int]:
+        """
+        Ids of the k best rule-passing, compatible products, ranked like `ComponentSelector.select_top_k`.
+        :param rules: Compiled rules only, see `supports`.
+        """
+        count = self.counts.get(component_type, 0)
+        mask = self.compatible_mask(component_type, selected_components, min_power)
+        for rule in rules:
+            rule_mask = rule.mask(self._rule_columns(component_type, rule), component_type, count)
+            mask = rule_mask if mask is None else mask & rule_mask
+
+        positions = np.arange(count) if mask is None else np.flatnonzero(mask)
+        if not len(positions):
+            return []
+        columns = {
+            feature: self.column(component_type, f"score.{feature}")[positions]
+            for feature in ["price", *(feature for feature, _ in SCORE_FEATURES.get(component_type, []))]
+        }
+        best = top_k(price_weighted_scores(columns, component_type), k)
+        return [int(product_id) for product_id in self.column(component_type, "id")[positions[best]]]
+
+    @staticmethod
+    def supports(rules: list[RuleBase]) -> bool:
+        """
+        Whether the rules can run on the arrays, only compiled rules have a vectorized form.
+        """
+        return all(isinstance(rule, CompiledRules) for rule in rules)
+
+
+class SharedCatalog:
+    """
+    Reader of the generations published under a directory.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._generation: Optional[CatalogGeneration] = None
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[CatalogGeneration]:
+        """
+        The published generation, None until the refresher wrote one.
+        A build should take it once and use it throughout.
+        """
+        try:
+            target = os.readlink(self.root / CURRENT_LINK)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            if self._generation is None or self._generation.path.name != target:
+                self._generation = CatalogGeneration(self.root / target)
+            return self._generation
+
+
+@lru_cache
+def _shared_catalog_at(root: str) -> SharedCatalog:
+    return SharedCatalog(Path(root))
+
+
+def get_shared_catalog() -> Optional[SharedCatalog]:
+    """
+    The process-wide reader of PC_BUILDER_SHARED_CATALOG_DIR, None when not configured.
+    """
+    root = get_settings().pc_builder_shared_catalog_dir
+    return _shared_catalog_at(root) if root else None
+
+
+def refresh_shared_catalog(session: Session, root: Path) -> Optional[Path]:
+    """
+    Write and publish a new generation unless the published one is at the current catalog version.
+    :return: The published generation, None if nothing changed.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    version = catalog_version(session)
+    current = SharedCatalog(root).current()
+    if version is not None and current is not None and current.version == version:
+        return None
+    version, catalog = load_versioned_catalog(session)
+    generation = write_generation(root, catalog, version)
+    publish_generation(root, generation)
+    return generation
+
+
+def run_refresher(root: Path, interval: float, once: bool = False) -> None:
+    from app.db.session import SessionLocal
+
+    while True:
+        with SessionLocal() as db:
+            try:
+                generation = refresh_shared_catalog(db, root)
+                if generation is not None:
+                    logging.info(f"Published shared catalog {generation.name}")
+            except Exception as e:
+                logging.error(f"Error while refreshing the shared catalog: {e}")
+        if once:
+            return
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", type=Path, default=settings.pc_builder_shared_catalog_dir)
+    parser.add_argument("--interval", type=float, default=settings.pc_builder_shared_catalog_refresh_seconds)
+    parser.add_argument("--once", action="store_true", help="Publish one generation and exit")
+    args = parser.parse_args()
+    if args.dir is None:
+        parser.error("set PC_BUILDER_SHARED_CATALOG_DIR or pass --dir")
+    run_refresher(args.dir, args.interval, args.once)
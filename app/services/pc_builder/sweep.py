@@ -0,0 +1,271 @@
+"""
+Best build for every point of a budget range in one dynamic-programming pass.
+
+Prices are discretized to `price_step` units and every part group becomes an array
+``values[c]``: the best total weighted score reachable with at most ``c`` units. Groups are combined with max-plus convolution,
+one shifted copy of the left array per breakpoint of the right one.
+
+Compatibility is handled by partitioning instead of per-pair checks: CPUs, motherboards
+and RAM are split by `ComponentSelector.compatibility_key` and only compatible
+(cpu, motherboard) pairs with their compatible RAM are combined; GPUs are combined with
+each case GPU-length limit group. PSUs depend on the budget tier through the estimated
+power draw, so the final combination is done once per tier.
+
+`sweep_budgets` makes the result exact: prices rounded up give builds that surely fit,
+prices rounded down a score no build can beat. Where the two differ the point is solved
+at exact prices by `BuildOptimizer`, starting from the rounded-up build.
+"""
+
+import math
+from collections import defaultdict
+from typing import Optional
+
+import numpy as np
+
+from app.models import Product
+from app.services.pc_builder.optimizer import BuildOptimizer
+from app.services.pc_builder.selector import ComponentSelector
+from app.services.pc_builder.scoring import extract_columns, quality_scores
+
+_NONE = -1
+
+
+class _Node:
+    """
+    values[c]: best score within c price units, -inf if nothing fits. Knows how to recover its parts.
+    """
+
+    values: np.ndarray
+
+    def parts_at(self, units: int) -> dict[str, Product]:
+        raise NotImplementedError
+
+    def breakpoints(self) -> np.ndarray:
+        """
+        Units at which the best score improves, the only budgets worth spending on this node.
+        """
+        values = self.values
+        improved = np.empty(len(values), dtype=bool)
+        improved[0] = values[0] > -np.inf
+        improved[1:] = values[1:] > values[:-1]
+        return np.flatnonzero(improved)
+
+
+class _Items(_Node):
+    """
+    Exactly one of the given products of a component type.
+    """
+
+    def __init__(self, component_type: str, products: list[Product], prices: np.ndarray, scores: np.ndarray, size: int):
+        self.component_type = component_type
+        self.products = products
+
+        # Best product at each exact price: cheapest-first order, best score and earliest first among equal prices
+        order = np.lexsort((np.arange(len(products)), -scores, prices))
+        order = order[prices[order] < size]
+        unique_prices, first = np.unique(prices[order], return_index=True)
+        at_price = np.full(size, -np.inf)
+        choice_at_price = np.full(size, _NONE, dtype=np.intp)
+        at_price[unique_prices] = scores[order[first]]
+        choice_at_price[unique_prices] = order[first]
+
+        # Then the best product within each budget: the last price at which the best score improved
+        self.values = np.maximum.accumulate(at_price)
+        improved = np.empty(size, dtype=bool)
+        improved[0] = self.values[0] > -np.inf
+        improved[1:] = self.values[1:] > self.values[:-1]
+        position = np.maximum.accumulate(np.where(improved, np.arange(size), _NONE))
+        self.choice = np.where(position >= 0, choice_at_price[np.maximum(position, 0)], _NONE)
+
+    def parts_at(self, units: int) -> dict[str, Product]:
+        return {self.component_type: self.products[self.choice[units]]}
+
+
+class _Sum(_Node):
+    """
+    Parts of both nodes, budget split between them optimally.
+    """
+
+    def __init__(self, left: _Node, right: _Node):
+        # Shift the node with many breakpoints once per breakpoint of the other one
+        if len(left.breakpoints()) < len(right.breakpoints()):
+            left, right = right, left
+        self.left, self.right = left, right
+        size = len(left.values)
+        self.values = np.full(size, -np.inf)
+        self.split = np.full(size, _NONE, dtype=np.intp)
+        for units in right.breakpoints():
+            candidate = np.full(size, -np.inf)
+            candidate[units:] = left.values[:size - units] + right.values[units]
+            better = candidate > self.values
+            self.values[better] = candidate[better]
+            self.split[better] = units
+
+    def parts_at(self, units: int) -> dict[str, Product]:
+        right_units = self.split[units]
+        return {**self.left.parts_at(units - right_units), **self.right.parts_at(right_units)}
+
+
+class _Best(_Node):
+    """
+    The best of alternative nodes, the first one on ties.
+    """
+
+    def __init__(self, options: list[_Node], size: int):
+        self.options = options
+        if not options:
+            self.values = np.full(size, -np.inf)
+            self.which = np.full(size, _NONE, dtype=np.intp)
+            return
+        stacked = np.stack([option.values for option in options])
+        self.which = np.argmax(stacked, axis=0)
+        self.values = stacked[self.which, np.arange(size)]
+
+    def parts_at(self, units: int) -> dict[str, Product]:
+        return self.options[self.which[units]].parts_at(units)
+
+
+class BudgetSweep:
+    """
+    Best-scoring compatible build for many budgets, see the module docstring.
+    """
+
+    def __init__(
+        self,
+        max_budget: float,
+        selector: ComponentSelector,
+        candidates: dict[str, list[Product]],
+        weights: dict[str, float],
+        price_step: float = 1.0,
+        round_up: bool = True,
+    ):
+        """
+        :param max_budget: Largest budget that will be asked for.
+        :param selector: Selector used for compatibility checks.
+        :param candidates: Rule-filtered candidates per component type.
+        :param weights: Weight of each component type's score in the total.
+        :param price_step: Price resolution, prices are rounded to a multiple of it.
+        :param round_up: Round prices up, so builds never exceed their budget. Rounded down,
+            builds may exceed it by up to a step per part but their score bounds the exact optimum.
+        """
+        self.selector = selector
+        self.weights = weights
+        self.price_step = price_step
+        self.round = math.ceil if round_up else math.floor
+        self.size = int(max_budget // price_step) + 1
+
+        self.groups: dict[str, dict[tuple, list[Product]]] = {}
+        for component_type, products in candidates.items():
+            selector.component_type = component_type
+            groups: dict[tuple, list[Product]] = defaultdict(list)
+            for product in products:
+                if product.price is not None:
+                    groups[selector.compatibility_key(product)].append(product)
+            self.groups[component_type] = groups
+
+        self.cpu_motherboard_ram = self._cpu_motherboard_ram()
+        rest = _Sum(self._gpu_case(), self._items("cpu_cooler", self._all("cpu_cooler")))
+        self.rest = _Sum(rest, self._items("storage", self._all("storage")))
+        self._totals: dict[int, _Node] = {}
+
+    def _all(self, component_type: str) -> list[Product]:
+        return [product for products in self.groups.get(component_type, {}).values() for product in products]
+
+    def _items(self, component_type: str, products: list[Product]) -> _Items:
+        units = np.array([self.round(round(product.price / self.price_step, 9)) for product in products], dtype=np.intp)
+        scores = quality_scores(extract_columns(products, component_type), component_type) * self.weights.get(component_type, 1.0)
+        return _Items(component_type, products, units, scores, self.size)
+
+    def _compatible(self, component_type: str, product: Product, selected_components: dict[str, Product]) -> bool:
+        self.selector.component_type = component_type
+        return self.selector.is_compatible_with(product, selected_components)
+
+    def _cpu_motherboard_ram(self) -> _Node:
+        """
+        Best of every compatible (cpu group, motherboard group) pair with the RAM fitting both.
+        Products of one group are interchangeable for compatibility, so a representative is checked.
+        """
+        options = []
+        for cpus in self.groups.get("cpu", {}).values():
+            cpu_items = self._items("cpu", cpus)
+            for motherboards in self.groups.get("motherboard", {}).values():
+                if not self._compatible("motherboard", motherboards[0], {"cpu": cpus[0]}):
+                    continue
+                rams = [
+                    ram for group in self.groups.get("ram", {}).values()
+                    if self._compatible("ram", group[0], {"cpu": cpus[0], "motherboard": motherboards[0]})
+                    for ram in group
+                ]
+                if rams:
+                    options.append(_Sum(_Sum(cpu_items, self._items("motherboard", motherboards)), self._items("ram", rams)))
+        return _Best(options, self.size)
+
+    def _gpu_case(self) -> _Node:
+        options = []
+        for cases in self.groups.get("case", {}).values():
+            gpus = [
+                gpu for group in self.groups.get("gpu", {}).values()
+                if self._compatible("case", cases[0], {"gpu": group[0]})
+                for gpu in group
+            ]
+            if gpus:
+                options.append(_Sum(self._items("gpu", gpus), self._items("case", cases)))
+        return _Best(options, self.size)
+
+    def _total(self, budget: float) -> _Node:
+        self.selector.budget = budget
+        min_power = self.selector._estimate_power_draw()
+        if min_power not in self._totals:
+            psus = [psu for psu in self._all("psu") if self._compatible("psu", psu, {})]
+            self._totals[min_power] = _Sum(self.cpu_motherboard_ram, _Sum(self.rest, self._items("psu", psus)))
+        return self._totals[min_power]
+
+    def best_build(self, budget: float) -> Optional[tuple[float, dict[str, Product]]]:
+        """
+        :return: (total weighted score, build) or None if no compatible build fits the budget.
+        """
+        units = min(int(budget // self.price_step), self.size - 1)
+        if units < 0:
+            return None
+        total = self._total(budget)
+        if total.values[units] == -np.inf:
+            return None
+        return float(total.values[units]), total.parts_at(units)
+
+
+def sweep_budgets(
+    budgets: list[float],
+    selector: ComponentSelector,
+    candidates: dict[str, list[Product]],
+    weights: dict[str, float],
+    price_step: float = 1.0,
+) -> list[Optional[tuple[float, dict[str, Product]]]]:
+    """
+    Best build at exact prices for each budget, see the module docstring.
+    ``price_step`` only trades DP size against how many points need the exact search.
+    :return: (total weighted score, build) per budget, None where no compatible build fits
+    """
+    max_budget = max(budgets)
+    feasible = BudgetSweep(max_budget, selector, candidates, weights, price_step, round_up=True)
+    optimistic = BudgetSweep(max_budget, selector, candidates, weights, price_step, round_up=False)
+
+    results = []
+    for budget in budgets:
+        bound = optimistic.best_build(budget)
+        if bound is None:
+            # Rounding down only adds builds, none fits at exact prices either
+            results.append(None)
+            continue
+        if sum(product.price for product in bound[1].values()) <= budget:
+            results.append(bound)
+            continue
+        best = feasible.best_build(budget)
+        if best is not None and best[0] >= bound[0]:
+            results.append(best)
+            continue
+
+        selector.budget = budget
+        optimizer = BuildOptimizer(budget=budget, selector=selector, candidates=candidates, weights=weights)
+        build = optimizer.solve(incumbent=best)
+        results.append(None if build is None else (optimizer.best_score, build))
+    return results
@@ -0,0 +1,86 @@
+"""
+Opt-in build tracing: where the time and the candidates of a build went.
+
+For every component type the trace records how candidates were fetched and how
+long it took, how many survived each rule and the compatibility checks, how long
+scoring took and which products came closest to the selected one. Rules and
+compatibility constraints are not pushed into SQL while tracing, so every step
+of the funnel is counted.
+"""
+
+import json
+import logging
+from typing import Optional
+
+from app.models import Product
+
+
+class ComponentTrace:
+    def __init__(self, component_type: str):
+        self.component_type = component_type
+        self.source: Optional[str] = None
+        self.fetch_ms = 0.0
+        self.fetched = 0
+        self.rules: list[dict] = []
+        self.compatible: Optional[int] = None
+        self.scoring_ms: Optional[float] = None
+        self.selected: Optional[dict] = None
+        self.runners_up: list[dict] = []
+
+    @staticmethod
+    def describe(product: Product, score: float) -> dict:
+        return {"asin": product.asin, "price": product.price, "score": round(float(score), 6)}
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "fetch_ms": round(self.fetch_ms, 3),
+            "fetched": self.fetched,
+            "rules": self.rules,
+            "compatible": self.compatible,
+            "scoring_ms": None if self.scoring_ms is None else round(self.scoring_ms, 3),
+            "selected": self.selected,
+            "runners_up": self.runners_up,
+        }
+
+
+class BuildTrace:
+    """
+    Trace of one `PCBuilder` run, see `PCBuilder.build(trace=True)`.
+    """
+
+    runners_up = 5
+
+    def __init__(self, purpose: str, budget: float, mode: str):
+        self.purpose = purpose
+        self.budget = budget
+        self.mode = mode
+        self.components: dict[str, ComponentTrace] = {}
+        self.total_ms = 0.0
+        # Time the optimizer spent searching combinations, optimal builds only
+        self.search_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def component(self, component_type: str) -> ComponentTrace:
+        if component_type not in self.components:
+            self.components[component_type] = ComponentTrace(component_type)
+        return self.components[component_type]
+
+    def to_dict(self) -> dict:
+        return {
+            "purpose": self.purpose,
+            "budget": self.budget,
+            "mode": self.mode,
+            "total_ms": round(self.total_ms, 3),
+            "search_ms": None if self.search_ms is None else round(self.search_ms, 3),
+            "error": self.error,
+            "components": {
+                component_type: component.to_dict() for component_type, component in self.components.items()
+            },
+        }
+
+    def emit(self) -> None:
+        """
+        Log the trace as a single JSON line, for log-based metrics.
+        """
+        logging.info(f"pc_builder_trace {json.dumps(self.to_dict())}")
@@ -1,41 +1,155 @@
-from sqlalchemy import select
+from datetime import datetime, timezone
+from sqlalchemy import select, or_
+import argparse
 import logging
+import os
+import socket
 
-from app.models import Product
+from app.models import Product, Category, ActualizerState
 from app.db.session import SessionLocal
-from app.services.keepa import api
+from app.services.keepa import (
+    api,
+    find_asins_with_price_change,
+    parse_current_price_and_rating,
+    FinderResultsTruncated,
+)
+from app.services.actualizer_shards import (
+    plan_shards,
+    claim_shard,
+    renew_lease,
+    complete_shard,
+    release_shard,
+)
 
+PRICE_ACTUALIZER_JOB = "prices_and_rating"
 
-def actualize_prices_and_rating():
+
+def _actualize_batch(db, products: list[Product]) -> bool:
+    """
+    Refresh price and rating of up to 100 products with one Keepa query and commit.
+    :return: False if Keepa could not be queried.
+    """
+    products_asins_map = {prod.asin: prod for prod in products}
+    try:
+        keepa_res = {res["asin"]: res for res in api.query(list(products_asins_map.keys()), stats=1, history=False, rating=True)}
+    except Exception as e:
+        logging.warning(f"Error scraping products data, saving already scraped info: {e}")
+        return False
+    refreshed_at = datetime.now(timezone.utc)
+    for product_asin, product in products_asins_map.items():
+        keepa_prod = keepa_res[product_asin]
+        if keepa_prod["stats_parsed"].get("current"):
+            product.price, product.rating = parse_current_price_and_rating(keepa_prod)
+            # Also when price and rating didn't change, the product is fresh, see `CRUDProduct.is_stale`
+            product.updated_at = refreshed_at
+
+    db.commit()
+    return True
+
+
+def _get_last_success_at(db) -> datetime | None:
+    return db.scalar(
+        select(ActualizerState.last_success_at).where(ActualizerState.job == PRICE_ACTUALIZER_JOB)
+    )
+
+
+def _set_last_success_at(db, run_started_at: datetime) -> None:
+    state = db.execute(
+        select(ActualizerState).where(ActualizerState.job == PRICE_ACTUALIZER_JOB)
+    ).scalar_one_or_none()
+    if state is None:
+        state = ActualizerState(job=PRICE_ACTUALIZER_JOB)
+        db.add(state)
+    state.last_success_at = run_started_at
+    state.updated_at = run_started_at
+    db.commit()
+
+
+def _select_changed_products(db, since: datetime):
+    """
+    Build the delta query: products whose price moved on Keepa since ``since``,
+    plus products the finder can't tell us about (never priced, without a category, or in
+    a virtual category whose negative id Keepa doesn't know).
+    Returns None if the product finder is unavailable or hit its result cap, and a full
+    refresh is needed.
+    """
+    category_keepa_ids: list[int] = db.execute(
+        select(Category.keepa_id)
+        .where(Category.keepa_id > 0, Category.products.any())
+    ).scalars().all()
+    try:
+        changed_asins = find_asins_with_price_change(category_keepa_ids, since) if category_keepa_ids else set()
+    except FinderResultsTruncated as e:
+        logging.info(f"{e}, falling back to full refresh")
+        return None
+    except Exception as e:
+        logging.warning(f"Keepa product finder failed, falling back to full refresh: {e}")
+        return None
+
+    logging.info(f"{len(changed_asins)} ASINs changed price on Keepa since {since}")
+    return select(Product).where(
+        or_(
+            Product.asin.in_(changed_asins),
+            Product.price.is_(None),
+            Product.category_id.is_(None),
+            Product.category.has(Category.keepa_id < 0),
+        )
+    )
+
+
+def actualize_prices_and_rating(delta: bool = False):
+    """
+    :param delta: Only refresh products that changed price since the last successful run.
+    """
+    run_started_at = datetime.now(timezone.utc)
     with SessionLocal() as db:
         try:
             stm = select(Product)
+            if delta and (since := _get_last_success_at(db)):
+                delta_stm = _select_changed_products(db, since)
+                if delta_stm is not None:
+                    stm = delta_stm
             products: list[Product] = db.execute(stm).scalars().all()
-            products_asins_map = {prod.asin: prod for prod in products}
-            products_asins = list(products_asins_map.keys())
-            splited_lists_of_products_asins: list[list[Product]] = [products_asins[i:i+100] for i in range(0,len(products_asins),100)]
-            for products_list in splited_lists_of_products_asins:
-                try:
-                    keepa_res = {res["asin"]: res for res in api.query(products_list, stats=1, history=False, rating=True)}
-                except Exception as e:
-                    logging.warning(f"Error scraping products data, saving already scraped info: {e}")
+            splited_lists_of_products: list[list[Product]] = [products[i:i+100] for i in range(0,len(products),100)]
+            for products_list in splited_lists_of_products:
+                if not _actualize_batch(db, products_list):
                     break
-                for product_asin in products_list:
-                    product = products_asins_map[product_asin]
-                    keepa_prod = keepa_res[product_asin]
-                    cur_prod_state = keepa_prod["stats_parsed"].get("current")
-                    if cur_prod_state:
-                        prod_rate = round(cur_prod_state.get("RATING", float(0)), 1) or None
-                        prod_price: float = (
-                            cur_prod_state.get("AMAZON") or 
-                            cur_prod_state.get("NEW") or 
-                            cur_prod_state.get("USED") or
-                            None
-                        )
-                        product.rating = prod_rate
-                        product.price = prod_price
-
-                db.commit()
+            else:
+                _set_last_success_at(db, run_started_at)
+
+        except Exception as e:
+            db.rollback()
+            logging.error(f"Error while processing prices and ratings from keepa: {e}")
+
+
+def run_price_actualizer_worker(worker_id: str | None = None) -> None:
+    """
+    Refresh prices shard by shard until the current run has no free shards left.
+    Any number of workers can run this concurrently, each claims disjoint product ranges.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    with SessionLocal() as db:
+        try:
+            plan_shards(db, PRICE_ACTUALIZER_JOB)
+            while shard := claim_shard(db, PRICE_ACTUALIZER_JOB, worker_id):
+                stm = (
+                    select(Product)
+                    .where(Product.id >= shard.product_id_from, Product.id < shard.product_id_to)
+                    .order_by(Product.id)
+                )
+                products: list[Product] = db.execute(stm).scalars().all()
+                splited_lists_of_products: list[list[Product]] = [products[i:i+100] for i in range(0,len(products),100)]
+
+                for products_list in splited_lists_of_products:
+                    if not _actualize_batch(db, products_list):
+                        # Out of Keepa tokens: hand the shard back and stop this worker.
+                        release_shard(db, shard, worker_id)
+                        return
+                    if not renew_lease(db, shard, worker_id):
+                        logging.warning(f"Lost lease on shard {shard.id}, leaving it to its new owner")
+                        break
+                else:
+                    complete_shard(db, shard, worker_id)
 
         except Exception as e:
             db.rollback()
@@ -43,4 +157,13 @@ def actualize_prices_and_rating():
 
 
 if __name__ == "__main__":
-    actualize_prices_and_rating()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--worker", action="store_true", help="Run as a sharded worker, safe to start on several hosts")
+    parser.add_argument("--worker-id", default=None)
+    parser.add_argument("--delta", action="store_true", help="Only refresh products whose price changed since the last successful run")
+    args = parser.parse_args()
+
+    if args.worker:
+        run_price_actualizer_worker(args.worker_id)
+    else:
+        actualize_prices_and_rating(delta=args.delta)
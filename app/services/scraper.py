@@ -1,3 +1,4 @@
+from typing import TYPE_CHECKING
 from bs4 import BeautifulSoup, ResultSet, Tag
 from app.schemas.attributes import (
     BaseAttrsSchema, 
@@ -11,19 +12,16 @@ from app.schemas.attributes import (
     CaseAttributesSchema,
 )
 from app.models import (
+    ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE,
     BaseAttrsModel,
-    CPUAttributes, 
-    CPUCoolerAttributes, 
-    MotherboardAttributes,
-    RAMAttributes,
-    StorageAttributes,
-    GPUAttributes,
-    Product, 
-    PowerSupplyAttributes,
-    CaseAttributes
+    Product,
+    attrs_model,
 )
 from app.db.session import SessionLocal
-from app.schemas.product import ProductCreate
+from app.schemas.product import ATTRS_SCHEMA_BY_MODEL, ProductCreate
+
+if TYPE_CHECKING:
+    from app.services.enrichment import EnrichmentStage
 
 
 CATEGORIES = [
@@ -40,23 +38,28 @@ CATEGORIES = [
 
 class PcBuilderScraper:
     schema_to_model_mapping: dict[type[BaseAttrsSchema],type[BaseAttrsModel]] = {
-        CPUAttributesSchema: CPUAttributes,
-        CPUCoolerAttributesSchema: CPUCoolerAttributes,
-        MotherboardAttributesSchema: MotherboardAttributes,
-        RAMAttributesSchema: RAMAttributes,
-        StorageAttributesSchema: StorageAttributes,
-        GPUAttributesSchema: GPUAttributes,
-        PowerSupplyAttributesSchema: PowerSupplyAttributes,
-        CaseAttributesSchema: CaseAttributes,
+        schema: model for model, schema in ATTRS_SCHEMA_BY_MODEL.items()
+    }
+
+    model_to_component_type: dict[type[BaseAttrsModel], str] = {
+        attrs_model(component_type): component_type for component_type in ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE
     }
 
+    def __init__(self, enrichment: "EnrichmentStage | None" = None):
+        """
+        :param enrichment: Optional stage that fills price, rating and category of inserted products from Keepa.
+        """
+        self.enrichment = enrichment
+
     def scrape_components(self, html: str, attrs_schema: type[BaseAttrsSchema]):
         soup = BeautifulSoup(html, "lxml")
         products_divs = soup.select("tbody > tr")
         products = self._get_processed_products_and_their_attrs(products_divs, attrs_schema)
 
         attrs_model = self.schema_to_model_mapping[attrs_schema]
-        self._add_all_products_and_their_attrs_to_db(products, attrs_model)
+        inserted_asins = self._add_all_products_and_their_attrs_to_db(products, attrs_model)
+        if self.enrichment is not None:
+            self.enrichment.submit(inserted_asins)
 
     def _get_processed_products_and_their_attrs(self, products_divs: ResultSet[Tag], attrs_schema: type[BaseAttrsSchema]) -> list[tuple[Product,CPUAttributesSchema]]:
         products: list[tuple[Product,BaseAttrsSchema]] = list()
@@ -265,18 +268,22 @@ class PcBuilderScraper:
 
         return attrs_schema(**attrs_mapping)
 
-    def _add_all_products_and_their_attrs_to_db(self, products: list[tuple[Product,BaseAttrsSchema]], attrs_model: type[BaseAttrsModel]) -> None:
+    def _add_all_products_and_their_attrs_to_db(self, products: list[tuple[Product,BaseAttrsSchema]], attrs_model: type[BaseAttrsModel]) -> list[str]:
+        inserted_asins: list[str] = list()
         with SessionLocal() as db:
             try:
                 for product, attrs in products:
+                    product.component_type = self.model_to_component_type[attrs_model]
                     db.add(product)
                     db.flush([product,])
                     attrs = attrs_model(product_id=product.id, **attrs.model_dump())
                     db.add(attrs)
+                    inserted_asins.append(product.asin)
                 db.commit()
             except Exception as e:
                 db.rollback()
                 raise(e)
+        return inserted_asins
 
 
 def _read_html_file(filename: str) -> str:
@@ -285,4 +292,9 @@ def _read_html_file(filename: str) -> str:
     return raw_data
 
 
-a = PcBuilderScraper().scrape_components(_read_html_file("Choose a Case - PC Builder.html"), CaseAttributesSchema)
+if __name__ == "__main__":
+    from app.services.enrichment import EnrichmentStage
+
+    with EnrichmentStage() as enrichment:
+        PcBuilderScraper(enrichment=enrichment).scrape_components(_read_html_file("Choose a Case - PC Builder.html"), CaseAttributesSchema)
+
@@ -0,0 +1,86 @@
+"""
+Rules applied one list pass per rule vs the compiled fused predicate and vectorized mask.
+
+    python -m benchmarks.bench_rules --count 50000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.services.pc_builder.rules import CompiledRules, RuleSpec
+from benchmarks.synthetic import RAM_TYPES, SOCKETS, make_products
+
+BENCH_RULE_SPECS = [
+    {"component_type": "cpu", "field": "cores", "op": ">=", "value": 6},
+    {"component_type": "cpu", "field": "threads", "op": ">=", "value": 6},
+    {"component_type": "cpu", "field": "socket_type", "op": "in", "value": SOCKETS[:3]},
+    {"component_type": "cpu", "field": "memory_type", "op": "in", "value": RAM_TYPES},
+    {"component_type": "cpu", "field": "memory_speed", "op": ">=", "value": 3200},
+    {"component_type": "cpu", "field": "base_speed", "op": ">=", "value": 2.5},
+    {"component_type": "cpu", "field": "price", "op": "<=", "value": 700},
+    {"component_type": "cpu", "field": "rating", "op": ">=", "value": 3.5},
+    {"component_type": "gpu", "field": "memory", "op": ">=", "value": 6},
+    {"component_type": "gpu", "field": "base_clock", "op": ">=", "value": 1000},
+    {"component_type": "gpu", "field": "length", "op": "<=", "value": 340},
+    {"component_type": "gpu", "field": "price", "op": "<=", "value": 1500},
+    {"component_type": "ram", "field": "total_memory", "op": ">=", "value": 16},
+    {"component_type": "ram", "field": "ram_speed", "op": ">=", "value": 3200},
+    {"component_type": "ram", "field": "ram_type", "op": "in", "value": RAM_TYPES},
+    {"component_type": "ram", "field": "quantity", "op": "<=", "value": 2},
+    {"component_type": "ram", "field": "one_unit_memory", "op": ">=", "value": 8},
+    {"component_type": "storage", "field": "mem_type", "op": "==", "value": "SSD"},
+    {"component_type": "storage", "field": "interface", "op": "==", "value": "M.2"},
+    {"component_type": "storage", "field": "capacity", "op": ">=", "value": 500},
+    {"component_type": "psu", "field": "power", "op": ">=", "value": 550},
+    {"component_type": "psu", "field": "efficiency", "op": "not_in", "value": ["80+", "80+ Bronze"]},
+    {"component_type": "case", "field": "side_panel", "op": "==", "value": "Glass"},
+    {"component_type": "case", "field": "cabinet_type", "op": "!=", "value": "Mini ITX"},
+]
+
+
+def bench(component_type: str, count: int, specs: list[RuleSpec]) -> None:
+    products = make_products(component_type, count)
+    type_specs = [spec for spec in specs if spec.component_type == component_type]
+    # One rule object per spec, each walking and copying the whole list like the hand-written rules.
+    chained = [CompiledRules([spec]) for spec in type_specs]
+    compiled = CompiledRules(specs)
+
+    started = time.perf_counter()
+    expected = products
+    for rule in chained:
+        expected = rule.apply(expected, component_type)
+    chained_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    fused = compiled.apply(products, component_type)
+    fused_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    columns = compiled.extract_columns(products, component_type)
+    extract_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    mask = compiled.mask(columns, component_type, len(products))
+    mask_time = time.perf_counter() - started
+
+    assert fused == expected, f"{component_type}: fused predicate differs"
+    assert [products[i] for i in np.flatnonzero(mask)] == expected, f"{component_type}: mask differs"
+
+    print(
+        f"{component_type:8} n={count:<7} rules={len(type_specs):<2} kept={len(expected):<7} "
+        f"chained {chained_time * 1000:7.1f} ms | fused {fused_time * 1000:7.1f} ms | "
+        f"column load {extract_time * 1000:7.1f} ms | mask {mask_time * 1000:6.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=50_000)
+    args = parser.parse_args()
+
+    specs = [RuleSpec.from_dict(spec) for spec in BENCH_RULE_SPECS]
+    print(f"{len(specs)} rules")
+    for component_type in dict.fromkeys(spec.component_type for spec in specs):
+        bench(component_type, args.count, specs)
@@ -0,0 +1,54 @@
+"""
+Scalar vs vectorized candidate scoring.
+
+    python -m benchmarks.bench_scoring --count 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.services.pc_builder.scoring import extract_columns, price_weighted_scores, top_k
+from app.services.pc_builder.selector import ComponentSelector
+from benchmarks.synthetic import make_products
+
+SCORED_TYPES = ["cpu", "gpu", "ram", "storage", "psu"]
+
+
+def bench(component_type: str, count: int, k: int) -> None:
+    products = make_products(component_type, count)
+    selector = ComponentSelector(budget=1500, rules=[], session=None, component_type=component_type)
+
+    started = time.perf_counter()
+    scored = [(product, selector._score(product)) for product in products]
+    scored.sort(key=lambda tup: tup[1], reverse=True)
+    scalar_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    columns = extract_columns(products, component_type)
+    extract_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scores = price_weighted_scores(columns, component_type)
+    best = top_k(scores, k)
+    vector_time = time.perf_counter() - started
+
+    scalar_scores = np.array([selector._score(product) for product in products])
+    assert np.array_equal(scalar_scores, scores), f"{component_type}: vectorized scores differ"
+    assert [products[i] for i in best] == [product for product, _ in scored[:k]], f"{component_type}: top-{k} differs"
+
+    print(
+        f"{component_type:8} n={count:<8} scalar score+sort {scalar_time * 1000:8.1f} ms | "
+        f"column load {extract_time * 1000:8.1f} ms | vectorized score+top-{k} {vector_time * 1000:6.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    for component_type in SCORED_TYPES:
+        bench(component_type, args.count, args.k)
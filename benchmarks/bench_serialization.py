@@ -0,0 +1,88 @@
+"""
+Serialization of a GET /products page with attrs: `ProductRead` models built from the
+instance dict plus a validate/dump round trip of the attrs schema, then validated again
+by the response model, against plain rows from `ProductRead.row_from_orm` validated once.
+
+    python -m benchmarks.bench_serialization --count 1000 --page-size 100
+
+Pages are loaded once, only mapping and serialization are timed. The response model is
+applied the way FastAPI does it: validation then `dump_json` of `list[ProductRead]`.
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.crud.product import product_crud
+from app.models import Product
+from app.schemas.product import ATTRS_BY_COMPONENT_TYPE, ProductCursor, ProductRead
+from benchmarks.seed import reset_schema, seed_catalog
+
+response_model = TypeAdapter(list[ProductRead])
+
+
+def legacy_read(obj: Product) -> ProductRead:
+    """
+    `ProductRead.from_orm_with_attrs` before the row mapper.
+    """
+    attr_name, schema = ATTRS_BY_COMPONENT_TYPE[obj.component_type]
+    attrs_model = getattr(obj, attr_name)
+    return ProductRead(**obj.__dict__, attrs=schema.model_validate(attrs_model).model_dump() if attrs_model else None)
+
+
+def respond(content: list) -> bytes:
+    return response_model.dump_json(response_model.validate_python(content))
+
+
+def bench(pages: list[list[Product]], mapper, repeat: int) -> dict:
+    latencies = []
+    for items in pages:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            respond([mapper(item) for item in items])
+            latencies.append((time.perf_counter() - started) * 1000)
+    return {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1000, help="Products per component type")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20, help="Serializations per page")
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_serialization.db'}")
+    reset_schema(engine)
+    seed_catalog(engine, args.count)
+
+    total = args.count * 8
+    rnd = random.Random(0)
+    with Session(engine) as db:
+        pages = []
+        for _ in range(args.pages):
+            after_id = rnd.randrange(0, max(total - args.page_size, 1))
+            items, _ = product_crud.get_page(db, page_size=args.page_size, cursor=ProductCursor(id=after_id) if after_id else None)
+            pages.append(items)
+
+        for items in pages:
+            if respond([legacy_read(item) for item in items]) != respond([ProductRead.row_from_orm(item) for item in items]):
+                raise SystemExit("row_from_orm serializes differently from the legacy mapper")
+
+        for name, mapper in (("from_orm_with_attrs", legacy_read), ("row_from_orm", ProductRead.row_from_orm)):
+            result = bench(pages, mapper, args.repeat)
+            print(f"{name:20} p50 {result['p50_ms']:7.3f} ms | p99 {result['p99_ms']:7.3f} ms per {args.page_size}-item page")
+
+
+if __name__ == "__main__":
+    main()
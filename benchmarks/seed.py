@@ -0,0 +1,52 @@
+"""
+Seed a database with the synthetic catalog.
+
+Works on any SQLAlchemy engine: a scratch Postgres database, or an in-process
+SQLite one as a stand-in. Rows are inserted with executemany batches, not ORM
+units of work, so million-row catalogs stay practical.
+"""
+
+from itertools import islice
+
+from sqlalchemy import Engine, insert, text
+
+from app.db.base import Base
+from app.models import Product
+from app.services.pc_builder.enums import COMPONENTS_ENUM
+from app.services.pc_builder.selector import ComponentSelector
+from benchmarks.synthetic import make_rows
+
+
+def reset_schema(engine: Engine) -> None:
+    """
+    Drop and recreate every table of the models. Only ever point this at a scratch database.
+    On Postgres also the catalog version row the catalog loader reads, which only migrations
+    create. Without the migration's triggers it moves only when `seed_catalog` bumps it.
+    """
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS catalog_version"))
+            connection.execute(text(
+                "CREATE TABLE catalog_version (id integer PRIMARY KEY CHECK (id = 1), version bigint NOT NULL)"
+            ))
+            connection.execute(text("INSERT INTO catalog_version (id, version) VALUES (1, 1)"))
+
+
+def seed_catalog(engine: Engine, count_per_type: int, seed: int = 0, batch_size: int = 10_000) -> None:
+    """
+    Insert ``count_per_type`` products with attrs for every component type.
+    """
+    with engine.begin() as connection:
+        for i, component_type in enumerate(COMPONENTS_ENUM):
+            attrs_model = ComponentSelector.component_types_to_attr_model_mapping[component_type]
+            rows = make_rows(component_type, count_per_type, seed, start_id=i * count_per_type + 1)
+            while batch := list(islice(rows, batch_size)):
+                connection.execute(insert(Product), [product for product, _ in batch])
+                connection.execute(
+                    insert(attrs_model),
+                    [{**attrs, "product_id": product["id"]} for product, attrs in batch],
+                )
+        if engine.dialect.name == "postgresql":
+            connection.execute(text("UPDATE catalog_version SET version = version + 1 WHERE id = 1"))
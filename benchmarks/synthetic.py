@@ -0,0 +1,170 @@
+"""
+Synthetic PC-part catalog used by the benchmarks.
+
+Products are built as transient ORM instances with their attrs attached,
+so they behave like rows loaded by `ComponentSelector`, or as plain column
+dicts for seeding a database (see `benchmarks.seed`).
+"""
+
+import random
+from typing import Iterator
+
+from app.models import Product
+from app.services.pc_builder.enums import COMPONENTS_ENUM
+from app.services.pc_builder.scoring import ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE
+from app.services.pc_builder.selector import ComponentSelector
+
+SOCKETS = ["AM4", "AM5", "LGA1200", "LGA1700"]
+RAM_TYPES = ["DDR4", "DDR5"]
+RAM_SPEEDS = [2666, 3200, 3600, 4800, 5600, 6000]
+# An empty cabinet type means no known GPU length limit
+CABINET_TYPES = ["Mini ITX", "MicroATX Mini Tower", "MicroATX Mid Tower", "ATX Mini Tower", "ATX Mid Tower", "ATX Full Tower", ""]
+BRANDS = ["Alpha", "Bravo", "Corsa", "Delta"]
+
+
+def _base(rnd: random.Random) -> dict:
+    return {"brand": rnd.choice(BRANDS), "model": f"M-{rnd.randrange(10000):04d}"}
+
+
+def _cpu(rnd: random.Random) -> tuple[dict, float]:
+    cores = rnd.choice([4, 6, 8, 12, 16, 24])
+    values = {
+        "cores": cores,
+        "threads": cores * rnd.choice([1, 2]),
+        "socket_type": rnd.choice(SOCKETS),
+        "base_speed": 3.0,
+        "turbo_speed": rnd.choice([4.2, 4.6, 5.0, 5.4]),
+        "architechture": rnd.choice(["Zen 4", "Raptor Lake"]),
+        "core_family": rnd.choice(["Ryzen", "Core"]),
+        "integrated_graphics": rnd.choice([None, "Radeon", "UHD 770"]),
+        "memory_type": rnd.choice(RAM_TYPES),
+        "memory_speed": rnd.choice(RAM_SPEEDS),
+        "series": rnd.choice(["5", "7", "9"]),
+        "generation": rnd.choice(["7000", "13th"]),
+    }
+    return values, 40 + cores * 18
+
+
+def _cpu_cooler(rnd: random.Random) -> tuple[dict, float]:
+    values = {
+        "fan_rpm_base": 600,
+        "fan_rpm_max": rnd.choice([1500, 2000, 2500]),
+        "noise_level_base": 18.0,
+        "noise_level_max": rnd.choice([28.0, 32.0, 36.0]),
+        "color": "black",
+    }
+    return values, 25
+
+
+def _gpu(rnd: random.Random) -> tuple[dict, float]:
+    memory = rnd.choice([4.0, 6.0, 8.0, 12.0, 16.0, 24.0])
+    values = {
+        "memory": memory,
+        "mem_interface": rnd.choice(["128-bit", "192-bit", "256-bit"]),
+        "length": rnd.choice([None, 170, 240, 280, 300, 330, 360]),
+        "interface": "PCIe 4.0 x16",
+        "chipset": rnd.choice(["GeForce", "Radeon"]),
+        "base_clock": 1400,
+        "clock_speed": rnd.choice([None, 1700, 2100, 2500]),
+        "frame_sync": rnd.choice(["G-Sync", "FreeSync"]),
+    }
+    return values, 60 + memory * 45
+
+
+def _motherboard(rnd: random.Random) -> tuple[dict, float]:
+    values = {
+        "chipset": rnd.choice(["B650", "X670", "B760", "Z790"]),
+        "form_factor": rnd.choice(["ATX", "Micro ATX", "Mini ITX"]),
+        "socket_type": rnd.choice(SOCKETS),
+        "ram_slots": rnd.choice([2, 4]),
+        "max_ram_support": rnd.choice([64, 128, 192]),
+    }
+    return values, 90
+
+
+def _ram(rnd: random.Random) -> tuple[dict, float]:
+    quantity = rnd.choice([1, 2, 4])
+    unit = rnd.choice([8, 16, 32])
+    values = {
+        "total_memory": quantity * unit,
+        "one_unit_memory": unit,
+        "quantity": quantity,
+        "ram_type": rnd.choice(RAM_TYPES),
+        "ram_speed": rnd.choice(RAM_SPEEDS),
+        "cas_latency": "16",
+    }
+    return values, 15 + quantity * unit * 2.5
+
+
+def _storage(rnd: random.Random) -> tuple[dict, float]:
+    capacity = rnd.choice([None, 250, 500, 1000, 2000, 4000])
+    values = {
+        "capacity": capacity,
+        "mem_type": rnd.choice(["SSD", "HDD"]),
+        "interface": "M.2",
+        "cache_mem": rnd.choice([None, 256, 1024]),
+        "form_factor": "M.2-2280",
+    }
+    return values, 30 + (capacity or 0) * 0.05
+
+
+def _psu(rnd: random.Random) -> tuple[dict, float]:
+    power = rnd.choice([450, 550, 650, 750, 850, 1000, 1200])
+    return {"power": power, "efficiency": "80+ Gold", "color": "black"}, 20 + power * 0.1
+
+
+def _case(rnd: random.Random) -> tuple[dict, float]:
+    return {"side_panel": "Glass", "cabinet_type": rnd.choice(CABINET_TYPES), "color": "black"}, 70
+
+
+ATTRS_FACTORIES = {
+    "cpu": _cpu,
+    "cpu_cooler": _cpu_cooler,
+    "gpu": _gpu,
+    "motherboard": _motherboard,
+    "ram": _ram,
+    "storage": _storage,
+    "psu": _psu,
+    "case": _case,
+}
+
+def make_rows(component_type: str, count: int, seed: int = 0, start_id: int = 1) -> Iterator[tuple[dict, dict]]:
+    """
+    Yield ``count`` (product, attrs) column dicts of one component type. Prices grow
+    with the specs plus noise, so cheap parts are not automatically the best ones.
+    Attrs are complete, so products also pass the API read schemas.
+    """
+    rnd = random.Random(f"{component_type}:{seed}")
+    for i in range(count):
+        values, base_price = ATTRS_FACTORIES[component_type](rnd)
+        product_id = start_id + i
+        product = {
+            "id": product_id,
+            "asin": f"B{product_id:09d}",
+            "title": f"Synthetic {component_type} #{i}",
+            "price": round(base_price * rnd.uniform(0.6, 1.6), 2),
+            "rating": round(rnd.uniform(3.0, 5.0), 1),
+            "component_type": component_type,
+        }
+        yield product, {**_base(rnd), **values}
+
+
+def make_products(component_type: str, count: int, seed: int = 0, start_id: int = 1) -> list[Product]:
+    """
+    Build ``count`` priced products of one component type from `make_rows`.
+    """
+    relationship = ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE[component_type]
+    model = ComponentSelector.component_types_to_attr_model_mapping[component_type]
+    products = []
+    for product_values, attrs_values in make_rows(component_type, count, seed, start_id):
+        product = Product(**product_values)
+        setattr(product, relationship, model(**attrs_values))
+        products.append(product)
+    return products
+
+
+def make_catalog(count_per_type: int, seed: int = 0) -> dict[str, list[Product]]:
+    catalog = {}
+    for i, component_type in enumerate(COMPONENTS_ENUM):
+        catalog[component_type] = make_products(component_type, count_per_type, seed, start_id=i * count_per_type + 1)
+    return catalog
@@ -0,0 +1,43 @@
+import os
+
+# Settings are read once at import time, the suite runs without Postgres or a Keepa key
+os.environ.setdefault("POSTGRES_DSN", "sqlite://")
+os.environ.setdefault("KEEPA_API_KEY", "test")
+os.environ.setdefault("PC_BUILDER_WORKERS", "1")
+
+import pytest
+from sqlalchemy import create_engine, event
+
+from benchmarks.seed import reset_schema, seed_catalog
+
+
+class QueryCounter:
+    """
+    Number of statements an engine executed since the counter was made.
+    """
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+@pytest.fixture
+def count_queries():
+    return QueryCounter
+
+
+@pytest.fixture
+def seeded_engine(tmp_path):
+    """
+    Factory of SQLite databases seeded with the synthetic catalog.
+    """
+    def make(count_per_type: int, seed: int = 0):
+        engine = create_engine(f"sqlite:///{tmp_path / f'catalog-{count_per_type}-{seed}.db'}")
+        reset_schema(engine)
+        seed_catalog(engine, count_per_type, seed)
+        return engine
+
+    return make
@@ -0,0 +1,14 @@
+from app.models import ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE, Product, attrs_model
+from app.schemas.product import ATTRS_BY_COMPONENT_TYPE
+from app.services.pc_builder.selector import ComponentSelector
+
+
+def test_mappings_follow_the_model_relationships():
+    assert ATTRS_BY_COMPONENT_TYPE.keys() == ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE.keys()
+    for component_type, relationship in ATTRS_RELATIONSHIP_BY_COMPONENT_TYPE.items():
+        model = attrs_model(component_type)
+        attr_name, schema = ATTRS_BY_COMPONENT_TYPE[component_type]
+        assert attr_name == relationship
+        assert set(schema.model_fields) <= set(model.__table__.columns.keys())
+        assert ComponentSelector.component_types_to_attr_model_mapping[component_type] is model
+        assert ComponentSelector.component_types_to_attr_relationship_mapping[component_type] is getattr(Product, relationship)
@@ -0,0 +1,124 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import CPUAttributes, Product
+from app.services.pc_builder.builder import NoSuitableComponent, PCBuilder
+from app.services.pc_builder.catalog import load_catalog
+from app.services.pc_builder.compatibility import CompatibilityIndex
+
+
+@pytest.fixture
+def engine(seeded_engine):
+    return seeded_engine(60)
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+@pytest.mark.parametrize("optimize", [False, True])
+def test_override_of_another_component_type_is_not_found(engine, indexed, optimize):
+    with Session(engine) as session:
+        gpu_asin = session.scalar(select(Product.asin).where(Product.component_type == "gpu").limit(1))
+        builder = PCBuilder(
+            budget=4000,
+            purpose="gaming",
+            session=session,
+            admin_overrides={"cpu": gpu_asin},
+            catalog_index=CompatibilityIndex(load_catalog(session)) if indexed else None,
+        )
+        with pytest.raises(NoSuitableComponent):
+            builder.build(optimize=optimize)
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_override_is_kept(engine, indexed):
+    with Session(engine) as session:
+        build = PCBuilder(budget=4000, purpose="gaming", session=session).build()
+        cpu_asin = build["cpu"].asin
+        builder = PCBuilder(
+            budget=4000,
+            purpose="gaming",
+            session=session,
+            admin_overrides={"cpu": cpu_asin},
+            catalog_index=CompatibilityIndex(load_catalog(session)) if indexed else None,
+        )
+        assert builder.build()["cpu"].asin == cpu_asin
+
+
+def _other_asin(session: Session, component_type: str, asin: str) -> str:
+    return session.scalar(
+        select(Product.asin)
+        .where(Product.component_type == component_type, Product.asin != asin, Product.price.isnot(None))
+        .order_by(Product.price.desc())
+        .limit(1)
+    )
+
+
+def _record_selections(builder: PCBuilder, monkeypatch) -> list[str]:
+    selected = []
+    select_component = builder._select
+
+    def recording_select(selector, component_type, *args, **kwargs):
+        selected.append(component_type)
+        return select_component(selector, component_type, *args, **kwargs)
+
+    monkeypatch.setattr(builder, "_select", recording_select)
+    return selected
+
+
+def test_rebuild_reselects_only_dependents_of_the_changed_part(engine, monkeypatch):
+    with Session(engine) as session:
+        builder = PCBuilder(budget=4000, purpose="gaming", session=session)
+        previous = builder.build()
+        gpu_asin = _other_asin(session, "gpu", previous["gpu"].asin)
+
+        selections = _record_selections(builder, monkeypatch)
+        rebuilt = builder.rebuild(previous, {"gpu": gpu_asin})
+
+    assert rebuilt["gpu"].asin == gpu_asin
+    # Only the case fits around the GPU, and the PSU is sized for the whole build
+    assert set(selections) <= {"case", "psu"}
+    for component_type in ("cpu", "cpu_cooler", "motherboard", "ram", "storage"):
+        assert rebuilt[component_type] is previous[component_type]
+
+
+def test_rebuild_keeps_pinned_components(engine, monkeypatch):
+    with Session(engine) as session:
+        previous = PCBuilder(budget=4000, purpose="gaming", session=session).build()
+        pinned_motherboard = previous["motherboard"].asin
+        builder = PCBuilder(
+            budget=4000,
+            purpose="gaming",
+            session=session,
+            admin_overrides={"motherboard": pinned_motherboard},
+        )
+        previous = builder.build()
+
+        selections = _record_selections(builder, monkeypatch)
+        rebuilt = builder.rebuild(previous, {"cpu": None})
+
+    assert rebuilt["motherboard"].asin == pinned_motherboard
+    assert rebuilt["cpu"].cpu_attributes.socket_type == rebuilt["motherboard"].motherboard_attributes.socket_type
+    assert "cpu" in selections and "motherboard" not in selections
+    for component_type in ("cpu_cooler", "gpu", "storage", "case"):
+        assert rebuilt[component_type] is previous[component_type]
+
+
+def test_rebuild_rejects_a_change_incompatible_with_a_pinned_part(engine):
+    with Session(engine) as session:
+        previous = PCBuilder(budget=4000, purpose="gaming", session=session).build()
+        socket_type = previous["motherboard"].motherboard_attributes.socket_type
+        other_socket_cpu = session.scalar(
+            select(Product.asin)
+            .join(Product.cpu_attributes)
+            .where(CPUAttributes.socket_type != socket_type)
+            .limit(1)
+        )
+        assert other_socket_cpu is not None
+        builder = PCBuilder(
+            budget=4000,
+            purpose="gaming",
+            session=session,
+            admin_overrides={"motherboard": previous["motherboard"].asin},
+        )
+        with pytest.raises(NoSuitableComponent):
+            builder.rebuild(previous, {"cpu": other_socket_cpu})
@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import v1
+from app.schemas.build import BuildSpec
+from app.services.pc_builder.builder import NoSuitableComponent
+
+
+def _create_build_raising(monkeypatch, error: Exception):
+    async def run_build_async(spec):
+        raise error
+
+    monkeypatch.setattr(v1, "run_build_async", run_build_async)
+    return asyncio.run(v1.create_build(BuildSpec(budget=1000, purpose="gaming")))
+
+
+def test_no_suitable_component_is_unprocessable(monkeypatch):
+    with pytest.raises(HTTPException) as e:
+        _create_build_raising(monkeypatch, NoSuitableComponent("Could not find suitable gpu"))
+    assert e.value.status_code == 422
+    assert e.value.detail == "Could not find suitable gpu"
+
+
+def test_other_errors_are_not_reported_as_bad_requests(monkeypatch):
+    with pytest.raises(RuntimeError):
+        _create_build_raising(monkeypatch, RuntimeError("connection reset"))
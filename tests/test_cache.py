@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.services.pc_builder import cache
+from app.services.pc_builder.cache import BuildCache
+from app.services.pc_builder.enums import COMPONENTS_ENUM
+
+
+def test_stats_count_hits_and_saved_time():
+    cache = BuildCache(max_entries=8, budget_step=25)
+
+    def compute():
+        time.sleep(0.01)
+        return {"cpu": "built"}
+
+    key = cache.make_key("gaming", 1010, None, 1, "greedy")
+    assert cache.get_or_compute(key, compute) == {"cpu": "built"}
+    assert cache.get_or_compute(cache.make_key("gaming", 1020, None, 1, "greedy"), compute) == {"cpu": "built"}
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["coalesced"]) == (1, 1, 1, 0)
+    assert stats["hit_rate"] == 0.5
+    assert stats["saved_seconds"] >= 0.01
+
+
+def test_concurrent_identical_builds_are_computed_once():
+    cache = BuildCache(max_entries=8, budget_step=25)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "build"
+
+    key = cache.make_key("office", 500, {"cpu": "B0"}, 3, "greedy")
+    leader = threading.Thread(target=cache.get_or_compute, args=(key, compute))
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=cache.get_or_compute, args=(key, compute))
+    follower.start()
+    while cache.stats()["coalesced"] == 0:
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 1
+
+
+def test_coalesced_caller_stops_waiting_at_its_deadline():
+    cache = BuildCache(max_entries=8, budget_step=25)
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        started.set()
+        release.wait()
+        return "build"
+
+    key = cache.make_key("gaming", 1500, None, 1, "greedy")
+    leader = threading.Thread(target=cache.get_or_compute, args=(key, compute))
+    leader.start()
+    started.wait()
+    waited = time.monotonic()
+    with pytest.raises(TimeoutError):
+        cache.get_or_compute(key, compute, deadline=waited + 0.05)
+    assert time.monotonic() - waited < 1
+
+    release.set()
+    leader.join()
+    assert cache.get_or_compute(key, compute, deadline=time.monotonic()) == "build"
+
+
+def test_build_runs_on_the_database_until_the_index_is_loaded(seeded_engine, monkeypatch):
+    def loading(session, deadline=None):
+        raise TimeoutError
+
+    monkeypatch.setattr(cache, "get_compatibility_index", loading)
+    misses = cache.build_cache.stats()["misses"]
+    with Session(seeded_engine(60)) as session:
+        build = cache.cached_build(budget=4000, purpose="office", session=session, deadline=time.monotonic() + 30)
+
+    assert list(build) == list(COMPONENTS_ENUM)
+    assert cache.build_cache.stats()["misses"] == misses
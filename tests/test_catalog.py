@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.services.pc_builder import catalog
+
+
+@pytest.fixture
+def versioned_catalog(seeded_engine, monkeypatch):
+    """
+    A seeded database whose catalog version is 1, as Postgres would report it.
+    """
+    monkeypatch.setattr(catalog, "catalog_version", lambda session: 1)
+    catalog.invalidate_compatibility_index()
+    yield seeded_engine(5)
+    catalog.invalidate_compatibility_index()
+
+
+def test_reload_is_shared_and_bounded_by_the_deadline(versioned_catalog, monkeypatch):
+    load = catalog.load_versioned_catalog
+    release = threading.Event()
+    loads = []
+
+    def slow_load(session):
+        loads.append(1)
+        release.wait()
+        return load(session)
+
+    monkeypatch.setattr(catalog, "load_versioned_catalog", slow_load)
+    with Session(versioned_catalog) as session:
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            catalog.get_compatibility_index(session, deadline=started + 0.05)
+        assert time.monotonic() - started < 1
+        with pytest.raises(TimeoutError):
+            catalog.get_compatibility_index(session, deadline=time.monotonic() + 0.05)
+
+        release.set()
+        index = catalog.get_compatibility_index(session, deadline=time.monotonic() + 5)
+        assert catalog.get_compatibility_index(session) is index
+
+    assert len(loads) == 1
+    assert all(index.catalog.values())
+
+
+def test_outdated_index_is_served_while_reloading(versioned_catalog, monkeypatch):
+    with Session(versioned_catalog) as session:
+        first = catalog.get_compatibility_index(session)
+        load = catalog.load_versioned_catalog
+        release = threading.Event()
+
+        def slow_load(session):
+            release.wait()
+            return load(session)
+
+        monkeypatch.setattr(catalog, "load_versioned_catalog", slow_load)
+        monkeypatch.setattr(catalog, "catalog_version", lambda session: 2)
+        started = time.monotonic()
+        assert catalog.get_compatibility_index(session, deadline=started + 0.05) is first
+        assert catalog.get_compatibility_index(session) is first
+        assert time.monotonic() - started < 1
+
+        reloading = catalog._loading
+        release.set()
+        reloading.result()
+        index = catalog.get_compatibility_index(session)
+
+    assert index is not first
+    assert (first.version, index.version) == (1, 2)
+
+
+def test_reload_error_reaches_the_caller(versioned_catalog, monkeypatch):
+    def failing_load(session):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(catalog, "load_versioned_catalog", failing_load)
+    with Session(versioned_catalog) as session:
+        with pytest.raises(RuntimeError, match="database went away"):
+            catalog.get_compatibility_index(session, deadline=time.monotonic() + 5)
@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.services.pc_builder.builder import PCBuilder
+from app.services.pc_builder.catalog import load_catalog
+from app.services.pc_builder.compatibility import CompatibilityIndex
+from app.services.pc_builder.frontier import FrontierStore
+
+
+def _ids(build: dict) -> dict[str, int]:
+    return {component_type: product.id for component_type, product in build.items()}
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_frontier_builds_match_full_catalog(seeded_engine, optimize):
+    engine = seeded_engine(150)
+    with Session(engine) as session:
+        index = CompatibilityIndex(load_catalog(session))
+        frontier = FrontierStore(index.catalog)
+        for purpose in ("gaming", "office", "development"):
+            for budget in (900, 1500, 2500, 4000):
+                def build(**kwargs):
+                    builder = PCBuilder(budget=budget, purpose=purpose, session=session, catalog_index=index, **kwargs)
+                    return _ids(builder.build(optimize=optimize))
+
+                assert build(frontier=frontier) == build()
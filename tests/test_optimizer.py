@@ -0,0 +1,71 @@
+from itertools import product as cartesian
+import random
+
+import numpy as np
+import pytest
+
+from app.services.pc_builder import optimizer as optimizer_module
+from app.services.pc_builder.optimizer import BuildOptimizer
+from app.services.pc_builder.selector import ComponentSelector
+from benchmarks.synthetic import make_catalog
+
+
+def _brute_force(optimizer: BuildOptimizer) -> list[float]:
+    """
+    Scores of every compatible in-budget combination of the optimizer's candidates, best first.
+    """
+    selector = optimizer.selector
+    scores = []
+    for combination in cartesian(*optimizer.items):
+        if sum(price for _, price, _ in combination) > optimizer.budget:
+            continue
+        chosen = {}
+        for component_type, (_, _, product) in zip(optimizer.search_order, combination):
+            selector.component_type = component_type
+            if not selector.is_compatible_with(product, chosen):
+                break
+            chosen[component_type] = product
+        else:
+            scores.append(sum(score for score, _, _ in combination))
+    return sorted(scores, reverse=True)
+
+
+def _optimizer(seed: int) -> BuildOptimizer:
+    """
+    Three candidates per type with random prices, so cheap GPUs meet expensive GPU/case pairs.
+    """
+    rnd = random.Random(seed)
+    catalog = make_catalog(3, seed)
+    for products in catalog.values():
+        for product in products:
+            product.price = round(rnd.uniform(5, 200), 2)
+    budget = rnd.uniform(300, 1200)
+    selector = ComponentSelector(budget=budget, rules=[], session=None)
+    return BuildOptimizer(budget=budget, selector=selector, candidates=catalog, weights={})
+
+
+@pytest.fixture
+def price_proportional_scores(monkeypatch):
+    # Scores proportional to price make the score-per-dollar bound tight, where a loose bound shows
+    monkeypatch.setattr(optimizer_module, "quality_scores", lambda columns, component_type: np.asarray(columns["price"], dtype=float))
+
+
+@pytest.mark.parametrize("seed", range(150))
+def test_top_k_matches_brute_force(seed, price_proportional_scores):
+    optimizer = _optimizer(seed)
+    expected = _brute_force(optimizer)[:5]
+
+    found = [score for score, _ in optimizer.top_k(5)]
+    assert found == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_solve_matches_brute_force(seed):
+    optimizer = _optimizer(seed)
+    expected = _brute_force(optimizer)
+
+    best = optimizer.solve()
+    if not expected:
+        assert best is None
+    else:
+        assert optimizer.best_score == pytest.approx(expected[0])
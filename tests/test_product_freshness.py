@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.crud.product import product_crud
+from app.models import Product
+from app.services import price_actualizer
+
+
+def _age(session: Session, product: Product, days: int) -> None:
+    session.execute(
+        update(Product).where(Product.id == product.id).values(updated_at=datetime.now(timezone.utc) - timedelta(days=days))
+    )
+    session.commit()
+    session.refresh(product)
+
+
+def test_inserted_product_is_fresh(seeded_engine):
+    with Session(seeded_engine(1)) as session:
+        product = Product(asin="B0FRESH0001", title="Fresh", price=10.0)
+        session.add(product)
+        session.commit()
+        assert not product_crud.is_stale(product, 60)
+
+
+def test_orm_update_refreshes_updated_at(seeded_engine):
+    with Session(seeded_engine(1)) as session:
+        product = session.scalars(select(Product).limit(1)).one()
+        _age(session, product, 2)
+        assert product_crud.is_stale(product, 60)
+
+        product.price = (product.price or 0) + 1
+        session.commit()
+        assert not product_crud.is_stale(product, 60)
+
+
+class _Keepa:
+    def __init__(self, products: list[Product]):
+        self.products = products
+
+    def query(self, asins, **kwargs):
+        return [
+            {"asin": product.asin, "stats_parsed": {"current": {"NEW": product.price, "RATING": product.rating or 0}}}
+            for product in self.products
+        ]
+
+
+def test_actualized_product_is_fresh_even_if_unchanged(seeded_engine, monkeypatch):
+    with Session(seeded_engine(1)) as session:
+        product = session.scalars(select(Product).where(Product.price.isnot(None)).limit(1)).one()
+        _age(session, product, 2)
+        monkeypatch.setattr(price_actualizer, "api", _Keepa([product]))
+
+        assert price_actualizer._actualize_batch(session, [product])
+        session.refresh(product)
+        assert not product_crud.is_stale(product, 60)
@@ -0,0 +1,94 @@
+import base64
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.api import v1
+from app.models import Product
+from app.schemas.product import ProductCursor
+
+
+@pytest.fixture
+def session(seeded_engine):
+    # 40 products, 5 per component type
+    with Session(seeded_engine(5)) as session:
+        yield session
+
+
+def _list(session: Session, page_size: int, cursor: str | None = None, sort: str = "id", total: str | None = None, page: int | None = None):
+    response = Response()
+    rows = v1.list_products(response, page_size=page_size, cursor=cursor, sort=sort, total=total, page=page, db=session)
+    return [row["id"] for row in rows], response.headers
+
+
+def _walk(session: Session, page_size: int, sort: str = "id") -> list[list[int]]:
+    pages, cursor = [], None
+    while True:
+        ids, headers = _list(session, page_size, cursor, sort)
+        pages.append(ids)
+        cursor = headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("page_size", [1, 7, 8, 40, 100])
+def test_pages_cover_every_product_once(session, page_size):
+    pages = _walk(session, page_size)
+
+    all_ids = session.scalars(select(Product.id).order_by(Product.id)).all()
+    assert [product_id for page in pages for product_id in page] == all_ids
+    assert all(len(page) == page_size for page in pages[:-1])
+    # A last page filling up exactly gets no cursor, instead of one pointing at an empty page
+    assert 0 < len(pages[-1]) <= page_size
+    assert len(pages) == -(-len(all_ids) // page_size)
+
+
+def test_price_pages_break_ties_on_id(session):
+    # Equal prices straddling page boundaries
+    tied = session.scalars(select(Product.id).where(Product.price.isnot(None)).order_by(Product.id).limit(9)).all()
+    session.execute(update(Product).where(Product.id.in_(tied)).values(price=123.45))
+    session.commit()
+
+    pages = _walk(session, 4, sort="price")
+
+    expected = session.scalars(
+        select(Product.id).where(Product.price.isnot(None)).order_by(Product.price, Product.id)
+    ).all()
+    assert [product_id for page in pages for product_id in page] == expected
+
+
+def test_total_count_header(session):
+    _, headers = _list(session, 10, total="exact")
+    assert headers["X-Total-Count"] == str(session.scalar(select(func.count()).select_from(Product)))
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        base64.urlsafe_b64encode(b"[1, 2").decode(),
+        base64.urlsafe_b64encode(b'{"id": "x"}').decode(),
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        # A price cursor without the price
+        base64.urlsafe_b64encode(b'{"sort": "price", "id": 3}').decode(),
+    ],
+)
+def test_invalid_cursor_is_a_bad_request(session, cursor):
+    with pytest.raises(HTTPException) as e:
+        _list(session, 10, cursor)
+    assert e.value.status_code == 400
+
+
+def test_cursor_of_another_sort_is_a_bad_request(session):
+    _, headers = _list(session, 10)
+    with pytest.raises(HTTPException) as e:
+        _list(session, 10, headers["X-Next-Cursor"], sort="price")
+    assert e.value.status_code == 400
+
+
+def test_page_and_cursor_are_exclusive(session):
+    with pytest.raises(HTTPException) as e:
+        _list(session, 10, ProductCursor(id=1).encode(), page=2)
+    assert e.value.status_code == 400
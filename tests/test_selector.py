@@ -0,0 +1,27 @@
+from sqlalchemy.orm import Session
+
+from app.services.pc_builder.builder import PCBuilder
+
+
+def _build_queries(count_queries, engine, purpose: str, budget: float) -> int:
+    counter = count_queries(engine)
+    with Session(engine) as session:
+        build = PCBuilder(budget=budget, purpose=purpose, session=session).build()
+        assert build
+    return counter.count
+
+
+def test_build_query_count_does_not_grow_with_catalog(seeded_engine, count_queries):
+    small = seeded_engine(60)
+    large = seeded_engine(400)
+    for purpose in ("gaming", "office", "development"):
+        assert _build_queries(count_queries, small, purpose, 3000) == _build_queries(count_queries, large, purpose, 3000)
+
+
+def test_build_issues_one_query_per_component_type(seeded_engine, count_queries):
+    engine = seeded_engine(50)
+    with Session(engine) as session:
+        builder = PCBuilder(budget=2000, purpose="gaming", session=session)
+        counter = count_queries(engine)
+        build = builder.build()
+    assert counter.count <= len(build)
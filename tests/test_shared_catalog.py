@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from sqlalchemy.orm import Session
+
+from app.services.pc_builder.catalog import load_versioned_catalog
+from app.services.pc_builder.shared_catalog import SharedCatalog, publish_generation, write_generation
+
+
+@pytest.fixture
+def catalog(seeded_engine):
+    with Session(seeded_engine(5)) as session:
+        return load_versioned_catalog(session)[1]
+
+
+def _publish(root, catalog, version):
+    generation = write_generation(root, catalog, version)
+    publish_generation(root, generation)
+    return generation
+
+
+def test_published_generation_holds_the_catalog(tmp_path, catalog):
+    _publish(tmp_path, catalog, 7)
+
+    current = SharedCatalog(tmp_path).current()
+    assert current.version == 7
+    assert current.counts == {component_type: len(products) for component_type, products in catalog.items()}
+    for component_type, products in catalog.items():
+        assert current.column(component_type, "id").tolist() == [product.id for product in products]
+
+
+def test_pruned_generation_stays_readable(tmp_path, catalog):
+    first = _publish(tmp_path, catalog, 1)
+    opened = SharedCatalog(tmp_path).current()
+    _publish(tmp_path, catalog, 2)
+    _publish(tmp_path, catalog, 3)
+
+    assert not first.exists()
+    assert sorted(path.name.split("-")[1] for path in tmp_path.glob("gen-*")) == ["2", "3"]
+    assert opened.top_k_ids("cpu", [], {}, 0, 3)
+    assert np.array_equal(opened.column("gpu", "price"), [product.price for product in catalog["gpu"]])
+
+
+def test_same_version_is_written_again(tmp_path, catalog):
+    first = _publish(tmp_path, catalog, 4)
+    # A half-written directory, as a crashed refresher could leave under the old naming
+    (tmp_path / "gen-4").mkdir()
+
+    fewer_cpus = {**catalog, "cpu": catalog["cpu"][:2]}
+    second = _publish(tmp_path, fewer_cpus, 4)
+
+    assert second != first
+    current = SharedCatalog(tmp_path).current()
+    assert current.path == second
+    assert current.counts["cpu"] == 2
+    assert current.column("cpu", "id").tolist() == [product.id for product in fewer_cpus["cpu"]]
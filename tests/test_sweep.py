@@ -0,0 +1,35 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.build import BuildSweepSpec
+from app.services.pc_builder.builder import get_component_weights
+from app.services.pc_builder.optimizer import BuildOptimizer
+from app.services.pc_builder.selector import ComponentSelector
+from app.services.pc_builder.sweep import sweep_budgets
+from benchmarks.synthetic import make_catalog
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("purpose", ["gaming", "office"])
+def test_sweep_matches_optimizer_at_exact_prices(seed, purpose):
+    catalog = make_catalog(12, seed)
+    weights = get_component_weights(purpose)
+    # Cent budgets, so rounding prices to whole dollars alone would miss builds
+    budgets = [400 + 25 * i + 0.37 * seed for i in range(80)]
+
+    results = sweep_budgets(budgets, ComponentSelector(budget=max(budgets), rules=[], session=None), catalog, weights)
+
+    for budget, result in zip(budgets, results):
+        optimizer = BuildOptimizer(budget, ComponentSelector(budget=budget, rules=[], session=None), catalog, weights)
+        if optimizer.solve() is None:
+            assert result is None
+            continue
+        score, build = result
+        assert score == pytest.approx(optimizer.best_score)
+        assert sum(product.price for product in build.values()) <= budget
+
+
+def test_sweep_spec_caps_points():
+    assert len(BuildSweepSpec(purpose="gaming", budget_from=400, budget_to=4000, budget_step=50).budgets()) == 73
+    with pytest.raises(ValidationError):
+        BuildSweepSpec(purpose="gaming", budget_from=1, budget_to=20000, budget_step=0.01)